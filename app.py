@@ -1,5 +1,5 @@
 import streamlit as st
-from utils import get_news_articles
+from utils import get_full_article, get_news_articles
 from advanced_analysis import get_source_credibility
 
 import logging
@@ -10,6 +10,9 @@ from gtts import gTTS
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Upper bound on how long a single query may take before partial results are shown
+QUERY_DEADLINE = 30  # seconds
+
 # Set page config
 st.set_page_config(
     page_title="News Sentiment Analysis",
@@ -33,6 +36,7 @@ st.sidebar.markdown(
     ### ℹ️ About this app
 
     - Fetches the latest news articles for any company.
+    - Quick mode scores the search result snippets; open an article to load it in full.
     - Analyzes and displays the sentiment (Positive, Negative, Neutral) for each article.
     - Shows a summary and a credibility score for each article.
     - Lets you listen to each summary using text-to-speech.
@@ -51,6 +55,13 @@ num_articles = st.sidebar.slider(
     help="Choose how many articles you want to see (1-15)"
 )
 
+# Quick mode skips article downloads; full articles are loaded on demand
+quick_mode = st.sidebar.checkbox(
+    "Quick Mode",
+    value=True,
+    help="Analyze the headline and snippet from the search results only. Use 'Load Full Article' for the full text."
+)
+
 # Add Clear History button to sidebar
 if st.sidebar.button("Clear History"):
     st.session_state.clear()
@@ -63,9 +74,13 @@ if company_name:
     with st.spinner("Fetching and analyzing news articles..."):
         try:
             # Get news articles with user-selected count (latest N)
-            articles = get_news_articles(company_name, num_articles)
+            articles = get_news_articles(company_name, num_articles, deadline=QUERY_DEADLINE, lite=quick_mode)
+            # Articles loaded in full from quick mode results, by URL
+            full_articles = st.session_state.setdefault('full_articles', {})
             
             if articles:
+                if articles.partial:
+                    st.info(f"Showing the articles that were ready within {QUERY_DEADLINE} seconds.")
                 # Show warning if fewer than requested articles are found
                 if len(articles) < num_articles:
                     st.warning(f"Only {len(articles)} articles found for the given company name.")
@@ -73,17 +88,30 @@ if company_name:
                 st.subheader(f"Article Analysis (Showing {len(articles)} latest articles)")
                 for i, article in enumerate(articles, 1):
                     with st.expander(f"{i}. {article['title']} ({article['source']})"):
+                        if article.get('lite'):
+                            load_clicked = article['url'] not in full_articles and st.button(
+                                "Load Full Article", key=f"load-{article['url']}")
+                            if load_clicked:
+                                with st.spinner("Downloading and analyzing the full article..."):
+                                    full_articles[article['url']] = get_full_article(article['url'])
+                            if full_articles.get(article['url']):
+                                article = full_articles[article['url']]
+                            elif article['url'] in full_articles:
+                                st.warning("The full article could not be loaded; showing the search result snippet.")
+                        
                         col1, col2 = st.columns([3, 1])
                         
                         with col1:
                             st.write("**Summary:**")
                             st.write(article['summary'])
-                            st.markdown("**Play Summary Audio**")
-                            tts = gTTS(text=article['summary'], lang='en')
-                            audio_bytes = io.BytesIO()
-                            tts.write_to_fp(audio_bytes)
-                            audio_bytes.seek(0)
-                            st.audio(audio_bytes, format='audio/mp3')
+                            # Search result snippets can be empty
+                            if article['summary']:
+                                st.markdown("**Play Summary Audio**")
+                                tts = gTTS(text=article['summary'], lang='en')
+                                audio_bytes = io.BytesIO()
+                                tts.write_to_fp(audio_bytes)
+                                audio_bytes.seek(0)
+                                st.audio(audio_bytes, format='audio/mp3')
                         
                         with col2:
                             # Display source credibility
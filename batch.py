@@ -0,0 +1,118 @@
+"""Batch news queries for a watchlist of companies.
+
+All companies run on the shared fetch engine, so they share one fetch
+scheduler, connection pool, article/search caches, near-duplicate index and
+sentiment micro-batcher.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fetcher import run_on_engine, run_sync, track_stats
+from utils import ArticleList, get_news_articles_async
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_COMPANIES = 8
+
+
+@dataclass
+class CompanyProgress:
+    """Outcome of one company in a batch."""
+    company: str
+    articles: int
+    partial: bool
+    elapsed: float
+    completed: int  # companies finished so far, including this one
+    total: int
+    error: Optional[str] = None
+
+
+@dataclass
+class BatchResult:
+    """Articles per company plus aggregate throughput numbers for the batch."""
+    articles: Dict[str, ArticleList] = field(default_factory=dict)
+    progress: List[CompanyProgress] = field(default_factory=list)
+    stats: Dict[str, float] = field(default_factory=dict)
+
+
+def get_news_articles_batch(companies: List[str], num_articles: int = 10, start_date: datetime = None,
+                            end_date: datetime = None, date_ranges: Dict[str, Tuple[datetime, datetime]] = None,
+                            deadline: float = None, max_concurrent: int = MAX_CONCURRENT_COMPANIES,
+                            progress_callback: Callable[[CompanyProgress], None] = None) -> BatchResult:
+    """
+    Fetch news for many companies at once.
+    `date_ranges` maps a company to its own (start_date, end_date), overriding the
+    shared `start_date`/`end_date`; `deadline` is a per-company budget in seconds.
+    `progress_callback` is called (from the fetch engine thread) as each company finishes.
+    """
+    return run_sync(_news_articles_batch(companies, num_articles, start_date, end_date, date_ranges,
+                                         deadline, max_concurrent, progress_callback))
+
+
+async def get_news_articles_batch_async(companies: List[str], num_articles: int = 10, start_date: datetime = None,
+                                        end_date: datetime = None, date_ranges: Dict[str, Tuple[datetime, datetime]] = None,
+                                        deadline: float = None, max_concurrent: int = MAX_CONCURRENT_COMPANIES,
+                                        progress_callback: Callable[[CompanyProgress], None] = None) -> BatchResult:
+    """Async version of get_news_articles_batch; can be awaited from any event loop."""
+    return await run_on_engine(_news_articles_batch(companies, num_articles, start_date, end_date, date_ranges,
+                                                    deadline, max_concurrent, progress_callback))
+
+
+async def _news_articles_batch(companies: List[str], num_articles: int, start_date: datetime, end_date: datetime,
+                               date_ranges: Dict[str, Tuple[datetime, datetime]], deadline: float,
+                               max_concurrent: int, progress_callback: Callable) -> BatchResult:
+    companies = list(dict.fromkeys(companies))  # drop repeated names, keep order
+    date_ranges = date_ranges or {}
+    result = BatchResult()
+    semaphore = asyncio.Semaphore(max(1, max_concurrent))
+    # Counts only this batch's fetches, not other queries sharing the engine
+    fetches = track_stats()
+    started = time.monotonic()
+
+    async def run_company(company: str):
+        company_start, company_end = date_ranges.get(company, (start_date, end_date))
+        async with semaphore:
+            company_started = time.monotonic()
+            error = None
+            try:
+                articles = await get_news_articles_async(company, num_articles, company_start, company_end, deadline)
+            except Exception as e:
+                logger.error(f"Batch query for '{company}' failed: {str(e)}")
+                articles, error = ArticleList(), str(e)
+            elapsed = time.monotonic() - company_started
+        result.articles[company] = articles
+        progress = CompanyProgress(company, len(articles), articles.partial, elapsed,
+                                   len(result.progress) + 1, len(companies), error)
+        result.progress.append(progress)
+        logger.info(f"[{progress.completed}/{progress.total}] {company}: {progress.articles} articles in {elapsed:.1f}s"
+                    + (" (partial)" if progress.partial else ""))
+        if progress_callback:
+            try:
+                progress_callback(progress)
+            except Exception as e:
+                logger.warning(f"Progress callback failed for '{company}': {str(e)}")
+
+    await asyncio.gather(*(run_company(company) for company in companies))
+
+    elapsed = time.monotonic() - started
+    total_articles = sum(len(articles) for articles in result.articles.values())
+    result.articles = {company: result.articles[company] for company in companies}
+    result.stats = {
+        'companies': len(companies),
+        'articles': total_articles,
+        'partial_companies': sum(1 for progress in result.progress if progress.partial),
+        'failed_companies': sum(1 for progress in result.progress if progress.error),
+        'elapsed_seconds': elapsed,
+        'articles_per_second': total_articles / elapsed if elapsed else 0.0,
+        'companies_per_minute': len(companies) * 60 / elapsed if elapsed else 0.0,
+        'http_requests': fetches['requests'],
+        'http_failures': fetches['failures'],
+        'megabytes_downloaded': fetches['bytes'] / (1024 * 1024),
+    }
+    return result
@@ -0,0 +1,117 @@
+"""Benchmark: article extraction backends (newspaper vs. lxml).
+
+Usage:
+    python benchmarks/bench_extractors.py [--archive DIR] [pages.html ...] [--repeat N]
+
+The corpus is taken from an HTTP archive recorded with replay.py (article
+responses only; search pages are skipped) and/or saved article pages.
+Without either, synthetic pages from the load-test stub server are used so
+the script still runs offline.
+
+For each backend it reports per-article CPU time, peak Python heap memory
+(tracemalloc; allocations made inside libxml2 are not traced),
+success rate, and agreement with the newspaper backend on title (exact,
+after whitespace normalization), body (word-set Jaccard similarity) and
+publish date (same day).
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from extractors import EXTRACTORS, get_extractor  # noqa: E402
+from replay import HttpArchive  # noqa: E402
+
+BASELINE = 'newspaper'
+
+
+def load_archive(directory: str):
+    """(url, html) for every successful, non-search HTML response in a recorded archive."""
+    archive = HttpArchive(directory, 'replay')
+    for url, entry in archive.items():
+        content_type = entry['headers'].get('Content-Type', 'text/html')
+        if entry['status'] == 200 and '/news/search' not in url and 'html' in content_type:
+            yield url, archive.read_body(entry)
+
+
+def synthetic_corpus(count: int = 30):
+    from loadtest.stub_server import StubConfig, render_article_page
+    config = StubConfig()
+    for i in range(count):
+        request = SimpleNamespace(match_info={'publisher': f"publisher{i % 7}", 'slug': f"example-corp-{i}"})
+        yield f"https://publisher{i % 7}.example.com/news/example-corp-{i}", render_article_page(request, config)
+
+
+def measure(extractor, url: str, html: str, repeat: int):
+    """(result, median CPU ms, peak traced KB) for extracting one article."""
+    cpu_times = []
+    for _ in range(repeat):
+        start = time.process_time()
+        result = extractor.extract(url, html)
+        cpu_times.append((time.process_time() - start) * 1000)
+    tracemalloc.start()
+    extractor.extract(url, html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, statistics.median(cpu_times), peak / 1024
+
+
+def _words(text: str) -> set:
+    return set(text.lower().split())
+
+
+def jaccard(a: str, b: str) -> float:
+    words_a, words_b = _words(a), _words(b)
+    if not words_a and not words_b:
+        return 1.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pages', nargs='*', help="saved article pages (.html)")
+    parser.add_argument('--archive', help="HTTP archive recorded with replay.py")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = []
+    if args.archive:
+        corpus.extend(load_archive(args.archive))
+    for path in args.pages:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            corpus.append((f"file://{os.path.abspath(path)}", f.read()))
+    if not corpus:
+        corpus = list(synthetic_corpus())
+        print("No corpus given; using synthetic stub pages")
+
+    extractors = {name: get_extractor(name) for name in EXTRACTORS}
+    results = {name: [] for name in extractors}
+    for url, html in corpus:
+        for name, extractor in extractors.items():
+            results[name].append(measure(extractor, url, html, args.repeat))
+
+    print(f"\n{len(corpus)} articles, {sum(len(html) for _, html in corpus) / len(corpus) / 1024:.0f} KB average")
+    print(f"{'backend':<10} {'ok':>5} {'CPU ms p50':>11} {'CPU ms p95':>11} {'peak KB p50':>12} "
+          f"{'title':>6} {'body':>6} {'date':>6}")
+    baseline = results[BASELINE]
+    for name, rows in results.items():
+        cpu = sorted(row[1] for row in rows)
+        memory = sorted(row[2] for row in rows)
+        pairs = [(row[0], base[0]) for row, base in zip(rows, baseline) if row[0] and base[0]]
+        title_agreement = body_agreement = date_agreement = float('nan')
+        if pairs:
+            title_agreement = sum(' '.join(a['title'].split()) == ' '.join(b['title'].split()) for a, b in pairs) / len(pairs)
+            body_agreement = statistics.mean(jaccard(a['text'], b['text']) for a, b in pairs)
+            date_agreement = sum((a['publish_date'] or '')[:10] == (b['publish_date'] or '')[:10] for a, b in pairs) / len(pairs)
+        ok = sum(1 for row in rows if row[0]) / len(rows)
+        print(f"{name:<10} {ok:>5.0%} {cpu[len(cpu) // 2]:>11.2f} {cpu[min(len(cpu) - 1, int(len(cpu) * 0.95))]:>11.2f} "
+              f"{memory[len(memory) // 2]:>12.0f} {title_agreement:>6.0%} {body_agreement:>6.0%} {date_agreement:>6.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""Benchmark: per-article CPU cost with eager vs. lazy summary/topics.
+
+Usage:
+    python benchmarks/bench_lazy_fields.py [--archive DIR] [pages.html ...] [--repeat N]
+
+Uses the same corpus options as bench_extractors.py. For each article it
+times the CPU stage as the pipeline runs it:
+
+  * eager - extraction + fingerprint, summary/keywords NLP, sentiment
+  * lazy - extraction + fingerprint, sentiment (fields=['title', 'text', 'sentiment'])
+  * lazy + access - lazy, then reading `summary` from the record afterwards
+
+Summaries need NLTK's punkt tokenizer data (nltk.download('punkt')).
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARKS_DIR, '..'))
+sys.path.insert(0, BENCHMARKS_DIR)
+
+from bench_extractors import load_archive, synthetic_corpus  # noqa: E402
+from utils import ARTICLE_EXTRACTOR, build_article_record, get_sentiment  # noqa: E402
+from workers import extract_article, summarize_article  # noqa: E402
+
+# One log line per built record would dominate the timings
+logging.getLogger('utils').setLevel(logging.WARNING)
+
+
+def eager(url: str, html: str):
+    fields, _ = extract_article(url, html, ARTICLE_EXTRACTOR)
+    fields.update(summarize_article(fields['title'], fields['text']))
+    return build_article_record(url, fields, get_sentiment(fields['text']))
+
+
+def lazy(url: str, html: str):
+    fields, _ = extract_article(url, html, ARTICLE_EXTRACTOR)
+    return build_article_record(url, fields, get_sentiment(fields['text']))
+
+
+def lazy_then_access(url: str, html: str):
+    record = lazy(url, html)
+    record['summary']
+    return record
+
+
+def cpu_ms(fn, url: str, html: str, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.process_time()
+        fn(url, html)
+        timings.append((time.process_time() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pages', nargs='*', help="saved article pages (.html)")
+    parser.add_argument('--archive', help="HTTP archive recorded with replay.py")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = list(load_archive(args.archive)) if args.archive else []
+    for path in args.pages:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            corpus.append((f"file://{os.path.abspath(path)}", f.read()))
+    if not corpus:
+        corpus = list(synthetic_corpus())
+        print("No corpus given; using synthetic stub pages")
+    corpus = [(url, html) for url, html in corpus if extract_article(url, html, ARTICLE_EXTRACTOR)]
+
+    try:
+        summarize_article('Warm up', 'The company reported results. Revenue grew strongly.')
+    except LookupError as e:
+        sys.exit(f"NLTK data missing, run nltk.download('punkt') first:\n{str(e)}")
+
+    print(f"\n{len(corpus)} articles, extractor '{ARTICLE_EXTRACTOR}'")
+    print(f"{'mode':<15} {'CPU ms p50':>11} {'CPU ms mean':>12} {'vs eager':>9}")
+    baseline = None
+    for name, fn in (('eager', eager), ('lazy', lazy), ('lazy + access', lazy_then_access)):
+        timings = [cpu_ms(fn, url, html, args.repeat) for url, html in corpus]
+        mean = statistics.mean(timings)
+        baseline = baseline or mean
+        print(f"{name:<15} {statistics.median(timings):>11.2f} {mean:>12.2f} {mean / baseline:>8.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Micro-benchmark: lxml search results parser vs. the original BeautifulSoup parser.
+
+Usage:
+    python benchmarks/bench_serp_parser.py [saved_page.html ...] [--repeat N]
+
+Pass Bing News results pages saved from a browser or from the HTTP
+recorder. Without arguments a synthetic page in the same card markup is
+generated so the script can still be run offline.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from serp import parse_search_results  # noqa: E402
+
+
+def legacy_extract_article_urls(html: str):
+    """The parser used before the lxml fast path, kept here as the baseline."""
+    soup = BeautifulSoup(html, 'html.parser')
+    news_cards = soup.find_all('a', {'class': 'title'})
+    if not news_cards:
+        news_cards = soup.find_all('div', {'class': 'news-card'})
+    if not news_cards:
+        news_cards = soup.find_all('div', {'class': 'news-item'})
+    article_urls = [card.get('href') for card in news_cards]
+    return [article_url for article_url in article_urls if article_url]
+
+
+def synthetic_page(num_cards: int = 30, padding_kb: int = 200) -> str:
+    """A results page in Bing's news card markup, padded with unrelated markup."""
+    cards = []
+    for i in range(num_cards):
+        url = f"https://publisher{i % 7}.example.com/business/2024/story-{i}"
+        cards.append(
+            f'<div class="news-card newsitem cardcommon" url="{url}" data-author="Publisher {i % 7}" data-title="Story {i}">'
+            f'<div class="caption"><a class="title" href="{url}" target="_blank">Story {i}</a>'
+            f'<div class="snippet" title="Snippet for story {i}">Snippet for story {i}</div>'
+            f'<div class="source set_top"><a aria-label="Publisher {i % 7}" href="#">Publisher {i % 7}</a>'
+            f'<span tabindex="0" aria-label="{i + 1} hours ago">{i + 1}h</span></div></div></div>'
+        )
+    filler = '<div class="b_nav"><span>menu</span><a href="#">link</a></div>' * (padding_kb * 1024 // 60)
+    return f"<html><head><title>news</title></head><body>{filler}{''.join(cards)}</body></html>"
+
+
+def time_parser(parser, html: str, repeat: int) -> float:
+    """Median wall time in milliseconds of `repeat` runs."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parser(html)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pages', nargs='*', help="saved Bing News results pages (.html)")
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    pages = []
+    for path in args.pages:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            pages.append((os.path.basename(path), f.read()))
+    if not pages:
+        pages.append(('synthetic', synthetic_page()))
+
+    print(f"{'page':<30} {'KB':>7} {'links':>6} {'bs4 ms':>9} {'lxml ms':>9} {'speedup':>8}  agree")
+    for name, html in pages:
+        legacy_links = legacy_extract_article_urls(html)
+        fast_links = [result.url for result in parse_search_results(html)]
+        legacy_ms = time_parser(legacy_extract_article_urls, html, args.repeat)
+        fast_ms = time_parser(parse_search_results, html, args.repeat)
+        agree = 'yes' if legacy_links == fast_links else f"no ({len(set(legacy_links) & set(fast_links))} shared)"
+        print(f"{name[:30]:<30} {len(html) / 1024:>7.0f} {len(fast_links):>6} {legacy_ms:>9.2f} {fast_ms:>9.2f} "
+              f"{legacy_ms / fast_ms:>7.1f}x  {agree}")
+
+
+if __name__ == '__main__':
+    main()
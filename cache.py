@@ -0,0 +1,306 @@
+"""On-disk caches for the news pipeline."""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from urls import canonicalize_url
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.environ.get('NEWS_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'news-sentiment'))
+ARTICLE_CACHE_TTL = 6 * 60 * 60  # seconds before a cached article is revalidated
+NEGATIVE_CACHE_TTL = 6 * 60 * 60  # seconds a failed URL is skipped after its first failure
+NEGATIVE_CACHE_MAX_TTL = 7 * 24 * 60 * 60
+# Set NEWS_SEARCH_CACHE_DISK=1 to also keep search results on disk
+SEARCH_CACHE_DISK = os.environ.get('NEWS_SEARCH_CACHE_DISK', '') == '1'
+
+# Disk bounds, enforced by a sweep on write at most every PRUNE_INTERVAL seconds.
+# Articles are evicted least recently written first (revalidation rewrites an entry).
+ARTICLE_CACHE_MAX_BYTES = int(os.environ.get('NEWS_CACHE_MAX_MB', '1024')) * 1024 * 1024
+ARTICLE_CACHE_MAX_AGE = 30 * 24 * 60 * 60
+PRUNE_INTERVAL = 10 * 60
+CACHE_FILE_SUFFIXES = ('.json', '.json.gz')
+
+
+def _write_json_atomic(path: str, data: Dict, compress: bool = False):
+    """Write JSON to `path` via a temporary file so readers never see a partial entry."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            payload = json.dumps(data).encode('utf-8')
+            f.write(gzip.compress(payload) if compress else payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _read_json(path: str, compress: bool = False) -> Optional[Dict]:
+    try:
+        with open(path, 'rb') as f:
+            payload = f.read()
+        return json.loads(gzip.decompress(payload) if compress else payload)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable cache entry {path}: {str(e)}")
+        return None
+
+
+class DirectoryPruner:
+    """Keeps a cache directory under a total size and/or file age, deleting the oldest files first."""
+
+    def __init__(self, directory: str, max_bytes: int = None, max_age: float = None, interval: float = PRUNE_INTERVAL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.interval = interval
+        self._last_run = 0.0
+        self._lock = threading.Lock()
+
+    def maybe_prune(self):
+        """Prune unless a sweep ran within the last `interval` seconds or is running in another thread."""
+        if time.monotonic() - self._last_run < self.interval or not self._lock.acquire(blocking=False):
+            return
+        try:
+            self._last_run = time.monotonic()
+            self.prune()
+        finally:
+            self._lock.release()
+
+    def prune(self) -> int:
+        """Delete expired files, then the oldest ones until the size bound holds. Returns the number deleted."""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(CACHE_FILE_SUFFIXES):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+        files.sort()
+
+        now = time.time()
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        for mtime, size, path in files:
+            expired = self.max_age is not None and now - mtime > self.max_age
+            if not expired and (self.max_bytes is None or total <= self.max_bytes):
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not prune cache entry {path}: {str(e)}")
+                continue
+            total -= size
+            removed += 1
+        if removed:
+            logger.info(f"Pruned {removed} entries from {self.directory}")
+        return removed
+
+
+def _remove_quietly(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class ArticleCache:
+    """Persistent article cache keyed by canonical URL.
+
+    Each entry holds the raw HTML, the extracted fields (title, text, summary,
+    keywords, publish_date) and the validators (ETag / Last-Modified) needed
+    to revalidate it with a conditional GET once it is older than `ttl`.
+    The directory is kept under `max_bytes` and `max_age` (see DirectoryPruner).
+    """
+
+    def __init__(self, directory: str = None, ttl: float = ARTICLE_CACHE_TTL,
+                 max_bytes: int = ARTICLE_CACHE_MAX_BYTES, max_age: float = ARTICLE_CACHE_MAX_AGE):
+        self.directory = directory or os.path.join(CACHE_DIR, 'articles')
+        self.ttl = ttl
+        self.pruner = DirectoryPruner(self.directory, max_bytes, max_age)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(canonicalize_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}.json.gz")
+
+    def get(self, url: str) -> Optional[Dict]:
+        """Return the cached entry for `url`, fresh or stale, or None."""
+        return _read_json(self._path(url), compress=True)
+
+    def is_fresh(self, entry: Dict) -> bool:
+        return time.time() - entry.get('fetched_at', 0) < self.ttl
+
+    def put(self, url: str, html: str, fields: Dict, etag: str = None, last_modified: str = None) -> Dict:
+        """Store the HTML and extracted fields for `url` and return the new entry."""
+        entry = {
+            'url': canonicalize_url(url),
+            'html': html,
+            'fields': fields,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time(),
+        }
+        _write_json_atomic(self._path(url), entry, compress=True)
+        self.pruner.maybe_prune()
+        return entry
+
+    def touch(self, url: str, entry: Dict) -> Dict:
+        """Mark a revalidated (304 Not Modified) entry as fresh again."""
+        entry['fetched_at'] = time.time()
+        _write_json_atomic(self._path(url), entry, compress=True)
+        return entry
+
+    def update_fields(self, url: str, entry: Dict, fields: Dict) -> Dict:
+        """Replace the extracted fields of an entry without changing its freshness."""
+        entry['fields'] = fields
+        _write_json_atomic(self._path(url), entry, compress=True)
+        return entry
+
+    @staticmethod
+    def conditional_headers(entry: Dict) -> Dict[str, str]:
+        """Validators to send with a conditional GET for a stale entry."""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+
+class NegativeCache:
+    """Persistent record of article URLs that recently failed to download or extract.
+
+    A URL is skipped until its retry time; every further failure doubles the
+    back-off, up to `max_ttl`. A URL that hasn't failed again for `max_ttl`
+    past its retry time is forgotten and its entry deleted.
+    """
+
+    def __init__(self, directory: str = None, ttl: float = NEGATIVE_CACHE_TTL, max_ttl: float = NEGATIVE_CACHE_MAX_TTL):
+        self.directory = directory or os.path.join(CACHE_DIR, 'failures')
+        self.ttl = ttl
+        self.max_ttl = max_ttl
+        # An entry is written at most max_ttl before its retry time, so this covers every forgotten one
+        self.pruner = DirectoryPruner(self.directory, max_age=2 * max_ttl)
+
+    def _path(self, url: str) -> str:
+        key = hashlib.sha256(canonicalize_url(url).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def _load(self, url: str) -> Optional[Dict]:
+        path = self._path(url)
+        entry = _read_json(path)
+        if entry and time.time() > entry.get('retry_after', 0) + self.max_ttl:
+            _remove_quietly(path)
+            return None
+        return entry
+
+    def is_blocked(self, url: str) -> bool:
+        entry = self._load(url)
+        return bool(entry) and time.time() < entry.get('retry_after', 0)
+
+    def record(self, url: str, reason: str):
+        entry = self._load(url) or {'failures': 0}
+        entry['failures'] += 1
+        entry['reason'] = reason
+        entry['retry_after'] = time.time() + min(self.max_ttl, self.ttl * (2 ** (entry['failures'] - 1)))
+        try:
+            _write_json_atomic(self._path(url), entry)
+        except OSError as e:
+            logger.warning(f"Could not record failed URL {url}: {str(e)}")
+        self.pruner.maybe_prune()
+
+    def clear(self, url: str):
+        try:
+            os.remove(self._path(url))
+        except FileNotFoundError:
+            pass
+
+
+SEARCH_CACHE_TTL = 60  # seconds a search results page is reused
+SEARCH_CACHE_MAX_ENTRIES = 512
+
+
+class SearchCache:
+    """TTL cache of extracted search results, keyed by (query, interval, page, format).
+
+    Entries are kept in memory (LRU-bounded); when `directory` is given they
+    are also written to disk so other processes and restarts can reuse them.
+    Expired disk entries are deleted when read and swept on write.
+    """
+
+    def __init__(self, ttl: float = SEARCH_CACHE_TTL, directory: str = None,
+                 max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.directory = directory
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.pruner = DirectoryPruner(directory, max_age=ttl) if directory else None
+
+    @staticmethod
+    def make_key(query: str, start_date: datetime = None, end_date: datetime = None, page: int = 0,
+                 serp_format: str = 'html') -> Tuple:
+        """Normalize the query and date interval into a cache key."""
+        normalized_query = ' '.join(query.lower().split())
+        interval = ''
+        if start_date and end_date:
+            interval = f"{start_date.strftime('%Y-%m-%d')}..{end_date.strftime('%Y-%m-%d')}"
+        return (normalized_query, interval, page, serp_format)
+
+    def _path(self, key: Tuple) -> str:
+        digest = hashlib.sha256(json.dumps(key).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, key: Tuple) -> Optional[List]:
+        """Return the cached results for `key` if they are younger than the TTL."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and now - entry['stored_at'] < self.ttl:
+                self._entries.move_to_end(key)
+                return entry['results']
+        if self.directory:
+            path = self._path(key)
+            entry = _read_json(path)
+            if entry and now - entry['stored_at'] < self.ttl:
+                self._remember(key, entry)
+                return entry['results']
+            if entry:
+                _remove_quietly(path)
+        return None
+
+    def put(self, key: Tuple, results: List):
+        entry = {'results': results, 'stored_at': time.time()}
+        self._remember(key, entry)
+        if self.directory:
+            try:
+                _write_json_atomic(self._path(key), entry)
+            except OSError as e:
+                logger.warning(f"Could not write search cache entry: {str(e)}")
+            self.pruner.maybe_prune()
+
+    def _remember(self, key: Tuple, entry: Dict):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,124 @@
+"""Near-duplicate detection for syndicated article bodies.
+
+Wire stories republished with small edits get nearly identical 64-bit
+SimHash fingerprints over word shingles. The index buckets fingerprints by
+eight 8-bit bands: two fingerprints within MAX_HAMMING_DISTANCE (6) bits of
+each other must agree exactly on at least one band, so a lookup only
+compares against the candidates sharing a band.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Set, Tuple
+
+SIMHASH_BITS = 64
+SHINGLE_SIZE = 3  # words per shingle
+MIN_SHINGLES = 20  # shorter bodies are never treated as duplicates
+MAX_HAMMING_DISTANCE = 6
+BANDS = 8  # must exceed MAX_HAMMING_DISTANCE
+MAX_INDEXED_DOCUMENTS = 50000
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+_BAND_BITS = SIMHASH_BITS // BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Lowercased word n-grams of `text`."""
+    words = _WORD.findall(text.lower())
+    return {' '.join(words[i:i + size]) for i in range(max(0, len(words) - size + 1))}
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash of the shingles of `text`, or None if the text is too short to compare."""
+    features = shingles(text)
+    if len(features) < MIN_SHINGLES:
+        return None
+    # Bit strings of the shingle hashes; column-wise majority votes give the fingerprint
+    hashes = [format(int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big'),
+                     f'0{SIMHASH_BITS}b') for feature in features]
+    majority = len(hashes) / 2
+    fingerprint = 0
+    for position, column in enumerate(zip(*hashes)):
+        if column.count('1') > majority:
+            fingerprint |= 1 << (SIMHASH_BITS - 1 - position)
+    return fingerprint
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class NearDuplicateIndex:
+    """Incremental SimHash index mapping documents to near-duplicate clusters.
+
+    Each cluster is identified by the id and fingerprint of its first
+    document, so a document re-indexed with a different body (a live page
+    rewritten since its last download) starts or joins another cluster
+    instead of keeping the old one. The index is bounded (oldest documents
+    are evicted first) so it can live for the whole lifetime of a
+    long-running process and match stories across queries.
+    """
+
+    def __init__(self, max_distance: int = MAX_HAMMING_DISTANCE, max_documents: int = MAX_INDEXED_DOCUMENTS):
+        self.max_distance = max_distance
+        self.max_documents = max_documents
+        self._documents = OrderedDict()  # doc id -> (fingerprint, cluster id)
+        self._bands = [{} for _ in range(BANDS)]  # band value -> set of doc ids
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _band_values(fingerprint: int):
+        return [(fingerprint >> (band * _BAND_BITS)) & _BAND_MASK for band in range(BANDS)]
+
+    def find(self, fingerprint: int) -> Optional[Tuple[str, int]]:
+        """Return the cluster id of an indexed near-duplicate of `fingerprint`, if any."""
+        with self._lock:
+            return self._find(fingerprint)
+
+    def _find(self, fingerprint: int) -> Optional[Tuple[str, int]]:
+        for band, value in enumerate(self._band_values(fingerprint)):
+            for doc_id in self._bands[band].get(value, ()):
+                other, cluster_id = self._documents[doc_id]
+                if hamming_distance(fingerprint, other) <= self.max_distance:
+                    return cluster_id
+        return None
+
+    def add(self, doc_id: str, fingerprint: Optional[int]) -> Tuple[str, Optional[int]]:
+        """
+        Index a document and return its cluster id, (first document id, its fingerprint);
+        that is (doc_id, fingerprint) if it has no near-duplicate.
+        """
+        if fingerprint is None:
+            return doc_id, None
+        with self._lock:
+            if doc_id in self._documents:
+                indexed, cluster_id = self._documents[doc_id]
+                if hamming_distance(fingerprint, indexed) <= self.max_distance:
+                    self._documents.move_to_end(doc_id)
+                    return cluster_id
+                # The body changed; index the new version from scratch
+                self._remove(doc_id)
+            cluster_id = self._find(fingerprint) or (doc_id, fingerprint)
+            self._documents[doc_id] = (fingerprint, cluster_id)
+            for band, value in enumerate(self._band_values(fingerprint)):
+                self._bands[band].setdefault(value, set()).add(doc_id)
+            while len(self._documents) > self.max_documents:
+                self._evict()
+            return cluster_id
+
+    def _evict(self):
+        self._remove(next(iter(self._documents)))
+
+    def _remove(self, doc_id: str):
+        fingerprint, _ = self._documents.pop(doc_id)
+        for band, value in enumerate(self._band_values(fingerprint)):
+            bucket = self._bands[band].get(value)
+            if bucket is not None:
+                bucket.discard(doc_id)
+                if not bucket:
+                    del self._bands[band][value]
+
+    def __len__(self) -> int:
+        return len(self._documents)
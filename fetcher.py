@@ -0,0 +1,777 @@
+"""Asyncio fetch engine used by the news pipeline.
+
+All network work runs on a single process-wide event loop living in a
+background thread, so synchronous callers (Streamlit, scripts) and async
+callers share the same connections and politeness state.
+"""
+import asyncio
+import atexit
+import contextvars
+import heapq
+import itertools
+import logging
+import queue
+import math
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+import aiohttp
+from multidict import CIMultiDict
+
+try:
+    # aiohttp decodes brotli responses when a brotli implementation is installed
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+REQUEST_TIMEOUT = 15  # seconds; also the ceiling for adaptive timeouts
+CONNECT_TIMEOUT = 5  # seconds
+MIN_REQUEST_TIMEOUT = 3  # seconds; floor for adaptive timeouts
+TIMEOUT_P95_MULTIPLIER = 3  # adaptive timeout = observed p95 latency x this
+
+# Response body limits
+MAX_RESPONSE_BYTES = 2 * 1024 * 1024  # decoded bytes read before a body is truncated
+CHUNK_SIZE = 64 * 1024
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+
+# Connection pool sizing for the shared session
+POOL_SIZE = 100
+POOL_SIZE_PER_HOST = 8
+KEEPALIVE_TIMEOUT = 30  # seconds an idle connection is kept for reuse
+
+# Transport-level retries
+MAX_RETRIES = 2
+RETRY_BACKOFF = 1.0  # seconds, doubled after each attempt
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Per-domain circuit breaker
+HEALTH_WINDOW = 50  # recent requests tracked per domain
+MIN_LATENCY_SAMPLES = 5  # before timeouts start adapting
+BREAKER_CONSECUTIVE_FAILURES = 3
+BREAKER_FAILURE_RATE = 0.5  # over the window, once at least 10 requests were made
+BREAKER_COOLDOWN = 60  # seconds; doubled each time the breaker re-trips
+BREAKER_MAX_COOLDOWN = 15 * 60
+DOMAIN_FAILURE_STATUSES = {401, 403, 429}  # plus any 5xx
+
+# Fetch scheduling: a global cap on in-flight requests plus a token bucket per host
+MAX_CONCURRENT_FETCHES = 32
+DEFAULT_HOST_RATE = 2.0  # requests per second
+DEFAULT_HOST_BURST = 4
+HOST_RATE_LIMITS = {
+    # host: (requests per second, burst)
+    'www.bing.com': (1.0, 3),
+}
+INTERACTIVE_RESERVED_FETCHES = 8  # global slots background work can never take
+
+# Request priorities; lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 1
+
+
+
+@dataclass
+class FetchResponse:
+    """Status, headers and decoded body of a completed GET request."""
+    url: str
+    status: int
+    headers: CIMultiDict  # case-insensitive, like aiohttp's
+    text: str
+    truncated: bool = False  # True if the body was cut off at the byte cap
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of fetching from a domain whose circuit breaker is open."""
+
+
+class DeadlineExceeded(Exception):
+    """Raised when the current query's time budget leaves no room for a request."""
+
+
+class UnsupportedContentError(Exception):
+    """Raised when a response is not one of the accepted content types (e.g. a PDF or video)."""
+
+
+class ResponseTooLargeError(Exception):
+    """Raised when a response declares a Content-Length above the byte cap."""
+
+
+class Budget:
+    """Time budget of one query. `exhausted` is set once a request was refused for lack of time."""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+        self.exhausted = False
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+
+# Budget of the query running in the current task, if any. Tasks spawned by the
+# query inherit it, so every fetch is scheduled against the same budget.
+current_budget = contextvars.ContextVar('current_budget', default=None)
+
+
+def set_deadline(seconds: float = None) -> Budget:
+    """Give the current task (and tasks it spawns) `seconds` of budget; None means unbounded."""
+    budget = Budget(seconds) if seconds is not None else None
+    current_budget.set(budget)
+    return budget
+
+
+def remaining_time() -> float:
+    """Seconds left in the current budget, or None if there is no deadline."""
+    budget = current_budget.get()
+    return None if budget is None else budget.remaining()
+
+
+# Priority and fairness flow (e.g. the company being polled) of the work running
+# in the current task. Like the budget, both are inherited by spawned tasks.
+current_priority = contextvars.ContextVar('current_priority', default=PRIORITY_INTERACTIVE)
+current_flow = contextvars.ContextVar('current_flow', default='')
+
+
+def set_priority(priority: int, flow: str = '') -> None:
+    """Run the current task's fetches at `priority`, sharing background slots fairly by `flow`."""
+    current_priority.set(priority)
+    current_flow.set(flow)
+
+
+def _check_budget(needed: float = 0.0):
+    budget = current_budget.get()
+    if budget is not None and budget.remaining() <= needed:
+        budget.exhausted = True
+        raise DeadlineExceeded("Time budget exhausted")
+
+
+class DomainStats:
+    """Recent latency and outcome history for one domain."""
+
+    def __init__(self):
+        self.latencies = deque(maxlen=HEALTH_WINDOW)
+        self.outcomes = deque(maxlen=HEALTH_WINDOW)  # True for success
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.trips = 0
+        self.half_open = False  # tripped before; the next request after the cool-down is a trial
+        self.trial_started = 0.0  # when the trial request in flight started (0: none)
+
+    def p95_latency(self) -> float:
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def failure_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+
+class DomainHealth:
+    """Per-domain latency tracking, adaptive timeouts and circuit breaking.
+
+    A domain's timeout follows its observed p95 latency. After repeated
+    failures (or a high failure rate) the breaker opens and requests to the
+    domain are refused for a cool-down period. After the cool-down it is
+    half-open: a single trial request goes through while the others are
+    refused, and its outcome closes the breaker or re-opens it with a longer
+    cool-down. A trial that never reports back (cancelled, or ended by an
+    error that says nothing about the domain) is replaced after REQUEST_TIMEOUT.
+    """
+
+    def __init__(self):
+        self._domains = {}
+
+    def stats(self, host: str) -> DomainStats:
+        if host not in self._domains:
+            self._domains[host] = DomainStats()
+        return self._domains[host]
+
+    def timeout_for(self, host: str) -> float:
+        stats = self.stats(host)
+        if len(stats.latencies) < MIN_LATENCY_SAMPLES:
+            return REQUEST_TIMEOUT
+        adaptive = stats.p95_latency() * TIMEOUT_P95_MULTIPLIER
+        return min(REQUEST_TIMEOUT, max(MIN_REQUEST_TIMEOUT, adaptive))
+
+    def check(self, host: str):
+        """Raise CircuitOpenError if requests to `host` are currently refused."""
+        stats = self.stats(host)
+        now = time.monotonic()
+        if stats.open_until > now:
+            raise CircuitOpenError(f"Circuit open for {host} for another {stats.open_until - now:.0f}s")
+        if stats.half_open:
+            if stats.trial_started and now - stats.trial_started < REQUEST_TIMEOUT:
+                raise CircuitOpenError(f"Circuit half-open for {host}; waiting for the trial request")
+            stats.trial_started = now
+
+    def record_success(self, host: str, latency: float):
+        stats = self.stats(host)
+        stats.latencies.append(latency)
+        stats.outcomes.append(True)
+        stats.consecutive_failures = 0
+        stats.trips = 0
+        stats.half_open = False
+        stats.trial_started = 0.0
+
+    def record_failure(self, host: str):
+        stats = self.stats(host)
+        stats.outcomes.append(False)
+        if stats.open_until > time.monotonic():
+            # A request started before the breaker opened; the cool-down already covers it
+            return
+        stats.consecutive_failures += 1
+        high_failure_rate = len(stats.outcomes) >= 10 and stats.failure_rate() >= BREAKER_FAILURE_RATE
+        if stats.half_open or stats.consecutive_failures >= BREAKER_CONSECUTIVE_FAILURES or high_failure_rate:
+            cooldown = min(BREAKER_MAX_COOLDOWN, BREAKER_COOLDOWN * (2 ** stats.trips))
+            stats.open_until = time.monotonic() + cooldown
+            stats.trips += 1
+            stats.half_open = True
+            stats.trial_started = 0.0
+            stats.consecutive_failures = 0
+            stats.outcomes.clear()
+            logger.warning(f"Circuit opened for {host} for {cooldown:.0f}s")
+
+
+class TokenBucket:
+    """Token bucket rate limiter. Waiters are served in arrival order."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def reserve(self) -> float:
+        """Take one token and return how many seconds to wait before using it."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+    async def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def try_take(self) -> float:
+        """Take a token if one is available now (returns 0), else return the wait without reserving."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class PrioritySlots:
+    """A counting semaphore that serves waiters by priority, then fairly across flows.
+
+    Higher-priority (lower value) waiters always go first, and `reserved`
+    slots are only ever given to interactive work, so an interactive request
+    never queues behind more than the in-flight background requests. Within a
+    priority, waiters are ordered by start-time fair queuing over their flow,
+    so a flow with many queued requests can't starve the others.
+    """
+
+    def __init__(self, capacity: int, reserved: int = 0):
+        self.capacity = capacity
+        self.reserved = min(reserved, capacity - 1)
+        self.in_use = 0
+        self._waiters = []  # heap of (priority, start tag, sequence, flow, future)
+        self._sequence = itertools.count()
+        self._virtual_time = 0
+        self._flow_finish = {}  # flow -> finish tag of its last queued request
+
+    def _has_room(self, priority: int) -> bool:
+        limit = self.capacity if priority <= PRIORITY_INTERACTIVE else self.capacity - self.reserved
+        return self.in_use < limit
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE, flow: str = ''):
+        if not self._waiters and self._has_room(priority):
+            self.in_use += 1
+            return
+        start = max(self._virtual_time, self._flow_finish.get((priority, flow), 0))
+        self._flow_finish[(priority, flow)] = start + 1
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, start, next(self._sequence), flow, future))
+        self._wake()  # there may be room for this priority even with others queued
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()  # granted just as we were cancelled
+            raise
+
+    def release(self):
+        self.in_use -= 1
+        self._wake()
+
+    def _wake(self):
+        while self._waiters:
+            priority, start, _, flow, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            if not self._has_room(priority):
+                return
+            heapq.heappop(self._waiters)
+            self._virtual_time = start
+            self.in_use += 1
+            future.set_result(None)
+        # Nothing queued: forget per-flow tags so they don't grow without bound
+        self._flow_finish.clear()
+        self._virtual_time = 0
+
+
+class FetchScheduler:
+    """Admission control for every request made through the fetch engine.
+
+    Each host gets its own token bucket, and a global priority-aware
+    semaphore caps the number of requests in flight across all queries and
+    Streamlit sessions in the process. Background requests (see set_priority)
+    yield to interactive ones both for slots and for host tokens: they take a
+    token only when one is free rather than reserving ahead of interactive
+    requests.
+    """
+
+    def __init__(self, max_concurrency: int = MAX_CONCURRENT_FETCHES, default_rate: float = DEFAULT_HOST_RATE,
+                 default_burst: float = DEFAULT_HOST_BURST, host_limits: Dict[str, Tuple[float, float]] = None,
+                 interactive_reserved: int = INTERACTIVE_RESERVED_FETCHES):
+        self.max_concurrency = max_concurrency
+        self.interactive_reserved = interactive_reserved
+        self.default_rate = default_rate
+        self.default_burst = default_burst
+        self.host_limits = dict(HOST_RATE_LIMITS if host_limits is None else host_limits)
+        self._buckets = {}
+        self._semaphore = None
+
+    def configure_host(self, host: str, rate: float, burst: float):
+        """Set the request rate and burst allowed for `host`."""
+        self.host_limits[host] = (rate, burst)
+        self._buckets.pop(host, None)
+
+    def bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            rate, burst = self.host_limits.get(host, (self.default_rate, self.default_burst))
+            self._buckets[host] = TokenBucket(rate, burst)
+        return self._buckets[host]
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        """Wait for the host's rate limit, then hold one of the global request slots."""
+        if self._semaphore is None:
+            # Created lazily so later changes to max_concurrency still apply
+            self._semaphore = PrioritySlots(self.max_concurrency, self.interactive_reserved)
+        host = (urlsplit(url).hostname or '').lower()
+        priority = current_priority.get()
+        # Wait for the host token first so slow hosts don't tie up global slots
+        bucket = self.bucket(host)
+        if priority <= PRIORITY_INTERACTIVE:
+            delay = bucket.reserve()
+            if delay > 0:
+                _check_budget(delay)
+                await asyncio.sleep(delay)
+        else:
+            while (delay := bucket.try_take()) > 0:
+                _check_budget(delay)
+                await asyncio.sleep(delay)
+        await self._semaphore.acquire(priority, current_flow.get())
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+# Shared by every fetch path in the process
+scheduler = FetchScheduler()
+domain_health = DomainHealth()
+
+
+_engine_loop = None
+_engine_lock = threading.Lock()
+_session = None
+
+# Process-wide counters: 'requests' (attempts sent), 'responses', 'bytes' (body bytes read), 'failures'
+fetch_stats = Counter()
+
+# The same counters for the work running in the current task (see track_stats), if any.
+# Like the budget, tasks spawned by a query inherit them.
+current_stats = contextvars.ContextVar('current_stats', default=None)
+
+
+def track_stats() -> Counter:
+    """Count the fetches of the current task (and tasks it spawns) in a new Counter, and return it."""
+    stats = Counter()
+    current_stats.set(stats)
+    return stats
+
+
+def _count(key: str, amount: int = 1):
+    fetch_stats[key] += amount
+    stats = current_stats.get()
+    if stats is not None:
+        stats[key] += amount
+
+# Record/replay archive installed by replay.py; None means live fetching
+http_archive = None
+
+
+def is_recording() -> bool:
+    """True while responses are being recorded; callers should then skip their caches so every fetch is archived."""
+    return http_archive is not None and http_archive.mode == 'record'
+
+
+def get_engine_loop() -> asyncio.AbstractEventLoop:
+    """Return the process-wide event loop that runs all fetch work, starting it on first use."""
+    global _engine_loop
+    with _engine_lock:
+        if _engine_loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name='news-fetch-engine', daemon=True)
+            thread.start()
+            _engine_loop = loop
+    return _engine_loop
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def run_sync(coro: Awaitable) -> Any:
+    """Run a coroutine on the engine loop and block until it finishes."""
+    loop = get_engine_loop()
+    if _running_loop() is loop:
+        raise RuntimeError("run_sync() cannot be called from the engine loop; await the coroutine instead")
+    future = asyncio.run_coroutine_threadsafe(coro, loop)
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
+
+
+async def run_on_engine(coro: Awaitable) -> Any:
+    """Await a coroutine on the engine loop from any event loop."""
+    loop = get_engine_loop()
+    if _running_loop() is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+async def _pump(agen: AsyncIterator, put: Callable):
+    """Drain `agen` on the engine loop, handing ('item' | 'error' | 'done', value) pairs to `put`."""
+    try:
+        async for item in agen:
+            put(('item', item))
+    except Exception as e:
+        put(('error', e))
+    finally:
+        await agen.aclose()
+        put(('done', None))
+
+
+def iterate_sync(agen: AsyncIterator) -> Iterator:
+    """Consume an async generator running on the engine loop from synchronous code.
+
+    Closing the returned iterator (or abandoning it) cancels the producer.
+    """
+    items = queue.Queue()
+    future = asyncio.run_coroutine_threadsafe(_pump(agen, items.put), get_engine_loop())
+    try:
+        while True:
+            kind, value = items.get()
+            if kind == 'done':
+                return
+            if kind == 'error':
+                raise value
+            yield value
+    finally:
+        future.cancel()
+
+
+async def iterate_async(agen: AsyncIterator) -> AsyncIterator:
+    """Consume an async generator running on the engine loop from any event loop.
+
+    Closing the returned iterator cancels the producer.
+    """
+    engine_loop = get_engine_loop()
+    if _running_loop() is engine_loop:
+        try:
+            async for item in agen:
+                yield item
+        finally:
+            await agen.aclose()
+        return
+
+    caller_loop = asyncio.get_running_loop()
+    items = asyncio.Queue()
+
+    def put(entry):
+        try:
+            caller_loop.call_soon_threadsafe(items.put_nowait, entry)
+        except RuntimeError:
+            # The consumer's loop is already closed; nobody is listening any more
+            pass
+
+    future = asyncio.run_coroutine_threadsafe(_pump(agen, put), engine_loop)
+    try:
+        while True:
+            kind, value = await items.get()
+            if kind == 'done':
+                return
+            if kind == 'error':
+                raise value
+            yield value
+    finally:
+        future.cancel()
+
+
+def get_session() -> aiohttp.ClientSession:
+    """Return the process-wide pooled client session. Must be called on the engine loop."""
+    global _session
+    if _running_loop() is not get_engine_loop():
+        raise RuntimeError("The shared session can only be used on the fetch engine loop")
+    if _session is None or _session.closed:
+        connector = aiohttp.TCPConnector(
+            limit=POOL_SIZE,
+            limit_per_host=POOL_SIZE_PER_HOST,
+            keepalive_timeout=KEEPALIVE_TIMEOUT,
+            ttl_dns_cache=300,
+        )
+        _session = aiohttp.ClientSession(headers=DEFAULT_HEADERS, connector=connector)
+    return _session
+
+
+async def _close_session():
+    if _session is not None and not _session.closed:
+        await _session.close()
+
+
+@atexit.register
+def _shutdown_engine():
+    if _engine_loop is not None and _engine_loop.is_running():
+        try:
+            asyncio.run_coroutine_threadsafe(_close_session(), _engine_loop).result(timeout=5)
+        except Exception as e:
+            logger.debug(f"Error closing the shared session: {str(e)}")
+
+
+def _retry_delay(attempt: int, response: aiohttp.ClientResponse = None) -> float:
+    """Exponential backoff, honouring a numeric Retry-After header when present."""
+    delay = RETRY_BACKOFF * (2 ** attempt)
+    if response is not None:
+        retry_after = response.headers.get('Retry-After', '')
+        if retry_after.isdigit():
+            delay = max(delay, min(float(retry_after), 30.0))
+    return delay
+
+
+_META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w-]+)', re.IGNORECASE)
+
+
+def _sniff_is_html(head: bytes) -> bool:
+    """Guess from the first bytes of a body whether it is an HTML document."""
+    sample = head[:1024].lstrip().lower()
+    return sample.startswith((b'<!doctype html', b'<html', b'<?xml', b'<head', b'<!--')) or b'<html' in sample
+
+
+def _check_content_type(response: aiohttp.ClientResponse, accept_types: Tuple[str, ...]) -> Optional[bool]:
+    """True if the declared type is accepted, None if no type was declared; raises otherwise."""
+    declared = response.headers.get('Content-Type')
+    if not declared:
+        return None
+    if response.content_type in accept_types:
+        return True
+    raise UnsupportedContentError(f"Unsupported content type {response.content_type} for {response.url}")
+
+
+async def _read_bounded(response: aiohttp.ClientResponse, max_bytes: int,
+                        accept_types: Tuple[str, ...]) -> Tuple[str, bool]:
+    """Stream a response body, enforcing the content type and byte cap. Returns (text, truncated)."""
+    declared_type_ok = _check_content_type(response, accept_types)
+    if response.content_length is not None and response.content_length > max_bytes:
+        raise ResponseTooLargeError(f"{response.url} declares {response.content_length} bytes (cap {max_bytes})")
+
+    body = bytearray()
+    truncated = False
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        if not body and declared_type_ok is None and HTML_CONTENT_TYPES[0] in accept_types and not _sniff_is_html(chunk):
+            raise UnsupportedContentError(f"Response from {response.url} does not look like HTML")
+        body.extend(chunk)
+        _count('bytes', len(chunk))
+        if len(body) >= max_bytes:
+            truncated = len(body) > max_bytes or not response.content.at_eof()
+            del body[max_bytes:]
+            break
+    if truncated:
+        logger.info(f"Truncated {response.url} at {max_bytes} bytes")
+
+    encoding = response.charset
+    if not encoding:
+        match = _META_CHARSET.search(bytes(body[:4096]))
+        encoding = match.group(1).decode('ascii') if match else 'utf-8'
+    try:
+        return body.decode(encoding, errors='replace'), truncated
+    except LookupError:
+        return body.decode('utf-8', errors='replace'), truncated
+
+
+async def _record(url: str, response: aiohttp.ClientResponse, text: str, truncated: bool, started: float):
+    """Save a final response to the archive when recording."""
+    # A 304 has no body and would replace the recorded 200 of the same URL
+    if not is_recording() or response.status == 304:
+        return
+    elapsed = time.monotonic() - started
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, http_archive.record, url, str(response.url), response.status,
+                               CIMultiDict(response.headers), text, truncated, elapsed)
+
+
+async def _replay(url: str, host: str, timeout: float = None) -> FetchResponse:
+    """Serve a recorded response like a single live attempt (recorded responses are final, so no retries)."""
+    domain_health.check(host)
+    _check_budget()
+    async with scheduler.slot(url):
+        request_timeout = timeout or domain_health.timeout_for(host)
+        remaining = remaining_time()
+        budget_limited = remaining is not None and remaining < request_timeout
+        if budget_limited:
+            _check_budget()
+            request_timeout = remaining
+        started = time.monotonic()
+        _count('requests')
+        try:
+            response = await asyncio.wait_for(http_archive.replay(url), timeout=request_timeout)
+        except asyncio.TimeoutError:
+            if budget_limited:
+                current_budget.get().exhausted = True
+                raise DeadlineExceeded(f"Time budget exhausted while fetching {url}")
+            domain_health.record_failure(host)
+            _count('failures')
+            raise
+        except aiohttp.ClientResponseError as e:
+            if e.status >= 500 or e.status in DOMAIN_FAILURE_STATUSES:
+                domain_health.record_failure(host)
+            raise
+        domain_health.record_success(host, time.monotonic() - started)
+        _count('bytes', len(response.text.encode('utf-8')))
+        _count('responses')
+        return response
+
+
+async def fetch(url: str, headers: Dict[str, str] = None, timeout: float = None,
+                max_retries: int = MAX_RETRIES, max_bytes: int = MAX_RESPONSE_BYTES,
+                accept_types: Tuple[str, ...] = HTML_CONTENT_TYPES) -> FetchResponse:
+    """GET `url` through the shared session, subject to the fetch scheduler.
+
+    The body is streamed: responses whose Content-Type is not in
+    `accept_types` (or, when undeclared, that don't look like HTML) raise
+    UnsupportedContentError, a declared Content-Length above `max_bytes`
+    raises ResponseTooLargeError, and reading stops once `max_bytes` have
+    been received, marking the response as truncated.
+
+    The timeout defaults to the domain's adaptive timeout and is capped by the
+    remaining query budget (see set_deadline); DeadlineExceeded is raised when
+    the budget runs out. Requests to a domain whose circuit breaker is open
+    raise CircuitOpenError without touching the network. Connection errors,
+    timeouts and retryable statuses (429/5xx) are retried with exponential
+    backoff; other HTTP errors are raised immediately. Non-error responses
+    such as 304 Not Modified are returned as-is.
+
+    When a replay archive is active (see replay.py) the response is served
+    from the archive instead, under the same scheduling, breaker and timeouts;
+    in record mode every final response is saved.
+    """
+    host = (urlsplit(url).hostname or '').lower()
+    if http_archive is not None and http_archive.mode == 'replay':
+        return await _replay(url, host, timeout)
+    session = get_session()
+    for attempt in range(max_retries + 1):
+        domain_health.check(host)
+        _check_budget()
+        budget_limited = False
+        try:
+            async with scheduler.slot(url):
+                request_timeout = timeout or domain_health.timeout_for(host)
+                remaining = remaining_time()
+                budget_limited = remaining is not None and remaining < request_timeout
+                if budget_limited:
+                    _check_budget()
+                    request_timeout = remaining
+                client_timeout = aiohttp.ClientTimeout(total=request_timeout, connect=min(CONNECT_TIMEOUT, request_timeout))
+                started = time.monotonic()
+                _count('requests')
+                async with session.get(url, headers=headers, timeout=client_timeout) as response:
+                    if response.status >= 500 or response.status in DOMAIN_FAILURE_STATUSES:
+                        domain_health.record_failure(host)
+                    if response.status in RETRY_STATUSES and attempt < max_retries:
+                        delay = _retry_delay(attempt, response)
+                        logger.info(f"Retrying {url} after HTTP {response.status} in {delay:.1f}s")
+                    else:
+                        if response.status >= 400:
+                            await _record(url, response, '', False, started)
+                        response.raise_for_status()
+                        text, truncated = '', False
+                        if response.status != 304:
+                            text, truncated = await _read_bounded(response, max_bytes, accept_types)
+                        domain_health.record_success(host, time.monotonic() - started)
+                        _count('responses')
+                        await _record(url, response, text, truncated, started)
+                        return FetchResponse(str(response.url), response.status, CIMultiDict(response.headers), text,
+                                             truncated)
+            # Back off outside the scheduler slot
+            _check_budget(delay)
+            await asyncio.sleep(delay)
+        except asyncio.TimeoutError:
+            if budget_limited:
+                # The query ran out of time; that says nothing about the domain
+                current_budget.get().exhausted = True
+                raise DeadlineExceeded(f"Time budget exhausted while fetching {url}")
+            domain_health.record_failure(host)
+            _count('failures')
+            if attempt >= max_retries:
+                raise
+            delay = _retry_delay(attempt)
+            logger.info(f"Retrying {url} after timeout in {delay:.1f}s")
+            _check_budget(delay)
+            await asyncio.sleep(delay)
+        except aiohttp.ClientConnectionError as e:
+            domain_health.record_failure(host)
+            _count('failures')
+            if attempt >= max_retries:
+                raise
+            delay = _retry_delay(attempt)
+            logger.info(f"Retrying {url} after {type(e).__name__} in {delay:.1f}s")
+            _check_budget(delay)
+            await asyncio.sleep(delay)
+
+
+async def fetch_text(url: str, headers: Dict[str, str] = None, timeout: float = None,
+                     max_retries: int = MAX_RETRIES, max_bytes: int = MAX_RESPONSE_BYTES,
+                     accept_types: Tuple[str, ...] = HTML_CONTENT_TYPES) -> str:
+    """GET `url` through the shared session and return the decoded body."""
+    response = await fetch(url, headers=headers, timeout=timeout, max_retries=max_retries,
+                           max_bytes=max_bytes, accept_types=accept_types)
+    return response.text
@@ -0,0 +1,65 @@
+"""Micro-batching of model inference calls made from the fetch engine loop."""
+import asyncio
+import logging
+from typing import Any, Callable, List
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MAX_BATCH_SIZE = 32
+MAX_BATCH_DELAY = 0.02  # seconds to wait for more items before running a partial batch
+
+
+class MicroBatcher:
+    """Collects single-item requests from concurrent tasks into batched calls.
+
+    `batch_fn` takes a list of inputs and returns a list of outputs in the
+    same order; it runs in the default executor so the event loop stays free.
+    Requests arriving within `max_delay` of each other (up to `max_batch_size`)
+    share one call, which is what batched model inference wants.
+    """
+
+    def __init__(self, batch_fn: Callable[[List[Any]], List[Any]], max_batch_size: int = MAX_BATCH_SIZE,
+                 max_delay: float = MAX_BATCH_DELAY):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self._pending = []  # (input, future)
+        self._flush_handle = None
+
+    async def submit(self, item: Any) -> Any:
+        """Queue `item` for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_delay, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List):
+        items = [item for item, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(None, self.batch_fn, items)
+        except Exception as e:
+            logger.warning(f"Batched inference of {len(items)} items failed: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark as retrieved: the submitter may have been cancelled meanwhile
+                    future.exception()
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
@@ -0,0 +1,165 @@
+"""Load driver for the news pipeline against the local stand-in server.
+
+Starts loadtest/stub_server.py (or uses --base-url), points the search URL
+and fetch layer at it, runs many concurrent company queries through the
+full pipeline (search page, article fetch, extraction, summary, sentiment)
+and reports throughput and latency percentiles.
+
+Text-to-speech is not exercised: gTTS talks to Google's service directly
+rather than through the fetch layer, so it can't be pointed at the stub.
+
+Usage:
+    python loadtest/driver.py --queries 200 --concurrency 20 --latency-ms 80 --error-rate 0.02
+    python loadtest/driver.py --serp-format rss  # search through the RSS feed instead
+"""
+import argparse
+import asyncio
+import math
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+from urllib.parse import urlsplit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile; 0.0 for an empty list."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_stub(args) -> Tuple[subprocess.Popen, str]:
+    port = _free_port()
+    command = [sys.executable, os.path.join(ROOT, 'loadtest', 'stub_server.py'), '--port', str(port),
+               '--latency-ms', str(args.latency_ms), '--latency-spread', str(args.latency_spread),
+               '--error-rate', str(args.error_rate), '--page-kb', str(args.page_kb),
+               '--page-spread', str(args.page_spread), '--seed', str(args.seed)]
+    process = subprocess.Popen(command)
+    deadline = time.monotonic() + 15
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process, f"http://127.0.0.1:{port}"
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Stub server did not start")
+
+
+async def run_load(args) -> Dict:
+    from utils import iter_news_articles_async
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    query_latencies, first_article_latencies, article_latencies = [], [], []
+    articles_total = 0
+    failed_queries = 0
+
+    async def run_query(index: int):
+        nonlocal articles_total, failed_queries
+        company = f"Company {index % args.companies}"
+        async with semaphore:
+            started = time.perf_counter()
+            count = 0
+            try:
+                async for _ in iter_news_articles_async(company, args.articles, serp_format=args.serp_format):
+                    elapsed = time.perf_counter() - started
+                    if count == 0:
+                        first_article_latencies.append(elapsed)
+                    article_latencies.append(elapsed)
+                    count += 1
+            except Exception as e:
+                failed_queries += 1
+                print(f"Query for {company} failed: {e}", file=sys.stderr)
+            query_latencies.append(time.perf_counter() - started)
+            articles_total += count
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_query(i) for i in range(args.queries)))
+    return {
+        'elapsed': time.perf_counter() - started,
+        'articles': articles_total,
+        'failed_queries': failed_queries,
+        'query_latencies': query_latencies,
+        'first_article_latencies': first_article_latencies,
+        'article_latencies': article_latencies,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the news pipeline against the stub server.")
+    parser.add_argument('--base-url', help="use an already running stub instead of starting one")
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--companies', type=int, default=None,
+                        help="distinct company names (default: one per query, so no search cache hits)")
+    parser.add_argument('--concurrency', type=int, default=20, help="queries in flight")
+    parser.add_argument('--articles', type=int, default=10, help="articles per query")
+    parser.add_argument('--serp-format', choices=('html', 'rss'), default='html',
+                        help="search through the results page or the RSS feed")
+    parser.add_argument('--max-fetches', type=int, default=256, help="global in-flight request cap")
+    parser.add_argument('--host-rate', type=float, default=10000, help="requests/s allowed to the stub")
+    parser.add_argument('--latency-ms', type=float, default=50.0)
+    parser.add_argument('--latency-spread', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--page-kb', type=float, default=40.0)
+    parser.add_argument('--page-spread', type=float, default=0.4)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    args.companies = args.companies or args.queries
+
+    stub = None
+    if args.base_url:
+        base_url = args.base_url.rstrip('/')
+    else:
+        stub, base_url = start_stub(args)
+
+    # Must be in place before the pipeline modules are imported
+    os.environ['NEWS_SEARCH_BASE_URL'] = base_url
+    os.environ['NEWS_CACHE_DIR'] = tempfile.mkdtemp(prefix='news-loadtest-cache-')
+
+    import fetcher
+    host = urlsplit(base_url).hostname
+    fetcher.POOL_SIZE = fetcher.POOL_SIZE_PER_HOST = args.max_fetches
+    fetcher.scheduler.max_concurrency = args.max_fetches
+    fetcher.scheduler.configure_host(host, args.host_rate, args.host_rate)
+
+    try:
+        result = asyncio.run(run_load(args))
+    finally:
+        if stub is not None:
+            stub.terminate()
+            stub.wait()
+
+    elapsed = result['elapsed']
+    stats = fetcher.fetch_stats
+    print(f"\n{args.queries} queries ({args.concurrency} concurrent, {args.serp_format} search) against {base_url} "
+          f"in {elapsed:.2f}s")
+    print(f"  queries/s        {args.queries / elapsed:8.1f}   failed: {result['failed_queries']}")
+    print(f"  articles/s       {result['articles'] / elapsed:8.1f}   total: {result['articles']}")
+    print(f"  HTTP requests/s  {stats['requests'] / elapsed:8.1f}   failures: {stats['failures']}, "
+          f"MB read: {stats['bytes'] / (1024 * 1024):.1f}")
+    print(f"  {'latency (ms)':<22}{'p50':>8}{'p95':>8}{'p99':>8}")
+    for label, key in (('query', 'query_latencies'), ('first article', 'first_article_latencies'),
+                       ('each article', 'article_latencies')):
+        values = result[key]
+        print(f"  {label:<22}" + ''.join(f"{percentile(values, pct) * 1000:8.0f}" for pct in (50, 95, 99)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""Local stand-in for Bing News and the publisher sites it links to.
+
+Serves search result pages in the news card markup parsed by serp.py (or,
+with format=rss, the same results as a Bing News RSS feed) and
+synthetic publisher articles that newspaper can extract, so the whole
+pipeline can be load-tested without touching real sites.
+
+Latency and page size follow log-normal distributions (a median plus a
+spread); a configurable fraction of requests fails with a retryable or
+permanent HTTP error.
+
+Usage:
+    python loadtest/stub_server.py --port 8900 --latency-ms 80 --error-rate 0.02 --page-kb 60
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from xml.sax.saxutils import escape
+
+from aiohttp import web
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PUBLISHERS = 25
+RESULTS_PER_PAGE = 10
+MAX_RESULTS = 200  # per query; later pages come back empty like Bing's
+ERROR_STATUSES = (500, 503, 429, 404)
+
+WORDS = (
+    "company shares revenue quarter earnings growth market investors analysts profit guidance outlook "
+    "demand supply chain product launch customers regulators acquisition deal strategy executive board "
+    "forecast margin cost sales cloud hardware software services region expansion competition pricing "
+    "results beat missed expectations rose fell percent billion million year report said statement"
+).split()
+
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 50.0  # median response latency
+    latency_spread: float = 0.5  # sigma of the log-normal latency distribution
+    error_rate: float = 0.0  # fraction of requests answered with an HTTP error
+    page_kb: float = 40.0  # median article page size
+    page_spread: float = 0.4  # sigma of the log-normal page size distribution
+    results_per_page: int = RESULTS_PER_PAGE
+    seed: int = 0
+
+
+def _lognormal(median: float, spread: float) -> float:
+    return median * random.lognormvariate(0, spread) if spread > 0 else median
+
+
+def _rng_for(*parts) -> random.Random:
+    """Deterministic randomness per page, so repeated requests get the same content."""
+    digest = hashlib.sha256('|'.join(str(part) for part in parts).encode('utf-8')).digest()
+    return random.Random(int.from_bytes(digest[:8], 'big'))
+
+
+def _sentences(rng: random.Random, count: int, subject: str) -> str:
+    sentences = []
+    for _ in range(count):
+        words = rng.choices(WORDS, k=rng.randint(12, 24))
+        sentences.append(f"{subject} {' '.join(words)}.")
+    return ' '.join(sentences)
+
+
+def _search_results(request: web.Request, config: StubConfig):
+    """(position, url, title, snippet, publisher) for the results on the requested page."""
+    query = request.query.get('q', 'company').replace('+', ' ')
+    first = max(1, int(request.query.get('first', '1') or 1))
+    base = f"{request.scheme}://{request.host}"
+    for position in range(first, min(first + config.results_per_page, MAX_RESULTS + 1)):
+        rng = _rng_for(config.seed, query, position)
+        publisher = rng.randrange(PUBLISHERS)
+        slug = f"{query.lower().replace(' ', '-')}-{position}"
+        url = f"{base}/publisher{publisher}/news/{slug}"
+        title = f"{query} {' '.join(rng.choices(WORDS, k=6))}"
+        yield position, url, title, _sentences(rng, 1, query), publisher
+
+
+def render_search_page(request: web.Request, config: StubConfig) -> str:
+    query = request.query.get('q', 'company').replace('+', ' ')
+    cards = []
+    for position, url, title, snippet, publisher in _search_results(request, config):
+        cards.append(
+            f'<div class="news-card newsitem cardcommon" url="{url}" data-author="Publisher {publisher}" data-title="{title}">'
+            f'<div class="caption"><a class="title" href="{url}" target="_blank">{title}</a>'
+            f'<div class="snippet" title="{snippet}">{snippet}</div>'
+            f'<div class="source set_top"><a aria-label="Publisher {publisher}" href="#">Publisher {publisher}</a>'
+            f'<span tabindex="0" aria-label="{position} hours ago">{position}h</span></div></div></div>'
+        )
+    return f"<html><head><title>{query} - Bing News</title></head><body><div id='news'>{''.join(cards)}</div></body></html>"
+
+
+def render_search_feed(request: web.Request, config: StubConfig) -> str:
+    """The same results as render_search_page, as a Bing News RSS feed (format=rss)."""
+    query = request.query.get('q', 'company').replace('+', ' ')
+    now = datetime.now(timezone.utc)
+    items = []
+    for position, url, title, snippet, publisher in _search_results(request, config):
+        items.append(
+            f"<item><title>{escape(title)}</title><link>{escape(url)}</link>"
+            f"<description>{escape(snippet)}</description>"
+            f"<pubDate>{format_datetime(now - timedelta(hours=position))}</pubDate>"
+            f"<News:Source>Publisher {publisher}</News:Source></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="utf-8" ?>'
+        '<rss version="2.0" xmlns:News="https://www.bing.com/news/search?q=&amp;format=rss">'
+        f"<channel><title>{escape(query)} - BingNews</title>{''.join(items)}</channel></rss>"
+    )
+
+
+def render_article_page(request: web.Request, config: StubConfig) -> str:
+    publisher, slug = request.match_info['publisher'], request.match_info['slug']
+    rng = _rng_for(config.seed, publisher, slug)
+    subject = slug.rsplit('-', 1)[0].replace('-', ' ').title()
+    published = datetime.now(timezone.utc) - timedelta(hours=rng.randint(1, 72))
+    target_bytes = _lognormal(config.page_kb, config.page_spread) * 1024
+    paragraphs = []
+    size = 0
+    while size < target_bytes * 0.6 or len(paragraphs) < 3:
+        paragraph = f"<p>{_sentences(rng, rng.randint(3, 6), subject)}</p>"
+        paragraphs.append(paragraph)
+        size += len(paragraph)
+    # The rest of the page weight is boilerplate, as on real publisher sites
+    boilerplate = '<div class="related"><a href="#">Related story</a></div>' * int(max(0, target_bytes - size) // 50)
+    title = f"{subject} {' '.join(rng.choices(WORDS, k=6))}"
+    return (
+        f"<html><head><title>{title}</title>"
+        f"<meta property='article:published_time' content='{published.isoformat()}'>"
+        f"<meta name='author' content='Reporter {rng.randrange(100)}'></head>"
+        f"<body><header><nav><a href='/'>{publisher}</a></nav></header>"
+        f"<article><h1>{title}</h1>{''.join(paragraphs)}</article>"
+        f"<aside>{boilerplate}</aside></body></html>"
+    )
+
+
+def create_app(config: StubConfig) -> web.Application:
+    async def respond(request: web.Request, render, content_type: str = 'text/html') -> web.Response:
+        await asyncio.sleep(_lognormal(config.latency_ms, config.latency_spread) / 1000)
+        if config.error_rate and random.random() < config.error_rate:
+            return web.Response(status=random.choice(ERROR_STATUSES), text='stub error')
+        return web.Response(text=render(request, config), content_type=content_type)
+
+    async def search(request: web.Request) -> web.Response:
+        if request.query.get('format') == 'rss':
+            return await respond(request, render_search_feed, 'application/rss+xml')
+        return await respond(request, render_search_page)
+
+    async def article(request: web.Request) -> web.Response:
+        return await respond(request, render_article_page)
+
+    app = web.Application()
+    app.router.add_get('/news/search', search)
+    app.router.add_get('/{publisher}/news/{slug}', article)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in Bing News and publisher server for load testing.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--latency-ms', type=float, default=StubConfig.latency_ms, help="median latency")
+    parser.add_argument('--latency-spread', type=float, default=StubConfig.latency_spread)
+    parser.add_argument('--error-rate', type=float, default=StubConfig.error_rate)
+    parser.add_argument('--page-kb', type=float, default=StubConfig.page_kb, help="median article page size")
+    parser.add_argument('--page-spread', type=float, default=StubConfig.page_spread)
+    parser.add_argument('--results-per-page', type=int, default=StubConfig.results_per_page)
+    parser.add_argument('--seed', type=int, default=StubConfig.seed)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    config = StubConfig(args.latency_ms, args.latency_spread, args.error_rate, args.page_kb,
+                        args.page_spread, args.results_per_page, args.seed)
+    logger.info(f"Serving stub Bing News on http://{args.host}:{args.port} with {config}")
+    web.run_app(create_app(config), host=args.host, port=args.port, print=None, access_log=None)
+
+
+if __name__ == '__main__':
+    main()
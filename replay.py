@@ -0,0 +1,201 @@
+"""Record/replay of HTTP traffic for deterministic offline benchmarks and tests.
+
+In record mode every response fetched through fetcher.fetch (search pages
+and article pages alike) is written, with its timing, to an on-disk
+archive. While recording, the article, search and failed-URL caches are
+bypassed so that every response a query needs ends up in the archive. In
+replay mode fetch serves responses from the archive instead of the
+network, optionally sleeping for the recorded (scaled) latency.
+
+The archive is a directory holding `index.jsonl` (one line per response)
+and gzip-compressed bodies under `bodies/`.
+
+Modes can be switched programmatically (start_recording / start_replay /
+stop) or for a whole process with the environment variables
+NEWS_HTTP_MODE=record|replay, NEWS_HTTP_ARCHIVE=<dir> and
+NEWS_REPLAY_LATENCY=<scale> (0 disables simulated latency).
+
+Usage:
+    python replay.py record --archive fixtures/apple Apple
+    python replay.py replay --archive fixtures/apple Apple --latency-scale 0
+    python replay.py record --archive fixtures/apple-rss Apple --serp-format rss
+"""
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import aiohttp
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+import fetcher
+from fetcher import FetchResponse
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Response headers worth keeping; the rest only bloat the archive
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Content-Length', 'Retry-After')
+
+
+class ReplayMissError(aiohttp.ClientConnectionError):
+    """Raised in replay mode for a URL that is not in the archive (treated like a network failure)."""
+
+
+class HttpArchive:
+    """An on-disk archive of recorded responses, in 'record' or 'replay' mode."""
+
+    def __init__(self, directory: str, mode: str, latency_scale: float = 1.0):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unsupported archive mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self._entries = {}
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(directory, 'bodies'), exist_ok=True)
+        self._load()
+
+    @property
+    def index_path(self) -> str:
+        return os.path.join(self.directory, 'index.jsonl')
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            if self.mode == 'replay':
+                logger.warning(f"Replay archive {self.directory} has no recorded responses")
+            return
+        with open(self.index_path, encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    # Later recordings of the same URL win; bodiless 304s never replace a full response
+                    if entry['status'] != 304:
+                        self._entries[entry['url']] = entry
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def record(self, url: str, final_url: str, status: int, headers: Dict[str, str], text: str, truncated: bool, elapsed: float):
+        """Append a response to the archive."""
+        headers = CIMultiDict(headers)
+        body = text.encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()
+        body_path = os.path.join(self.directory, 'bodies', f"{digest}.gz")
+        entry = {
+            'url': url,
+            'final_url': final_url,
+            'status': status,
+            'headers': {name: headers[name] for name in RECORDED_HEADERS if name in headers},
+            'body': f"{digest}.gz",
+            'truncated': truncated,
+            'elapsed': round(elapsed, 4),
+            'recorded_at': time.time(),
+        }
+        with self._lock:
+            if not os.path.exists(body_path):
+                with open(body_path, 'wb') as f:
+                    f.write(gzip.compress(body))
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry) + '\n')
+            self._entries[url] = entry
+
+    def items(self):
+        """(url, entry) pairs for every recorded URL."""
+        return list(self._entries.items())
+
+    def lookup(self, url: str) -> Optional[Dict]:
+        return self._entries.get(url)
+
+    def read_body(self, entry: Dict) -> str:
+        with open(os.path.join(self.directory, 'bodies', entry['body']), 'rb') as f:
+            return gzip.decompress(f.read()).decode('utf-8')
+
+    async def replay(self, url: str) -> FetchResponse:
+        """Serve `url` from the archive, simulating its recorded latency."""
+        entry = self.lookup(url)
+        if entry is None:
+            raise ReplayMissError(f"No recorded response for {url}")
+        if self.latency_scale > 0 and entry['elapsed'] > 0:
+            await asyncio.sleep(entry['elapsed'] * self.latency_scale)
+        if entry['status'] >= 400:
+            request_info = aiohttp.RequestInfo(URL(url), 'GET', CIMultiDictProxy(CIMultiDict()), URL(url))
+            raise aiohttp.ClientResponseError(request_info, (), status=entry['status'],
+                                              message='Recorded error response')
+        loop = asyncio.get_running_loop()
+        text = await loop.run_in_executor(None, self.read_body, entry)
+        return FetchResponse(entry.get('final_url', url), entry['status'], CIMultiDict(entry['headers']), text, entry.get('truncated', False))
+
+
+def start_recording(directory: str) -> HttpArchive:
+    """Record every fetched response into `directory` (appending to an existing archive)."""
+    fetcher.http_archive = HttpArchive(directory, 'record')
+    logger.info(f"Recording HTTP responses to {directory}")
+    return fetcher.http_archive
+
+
+def start_replay(directory: str, latency_scale: float = 1.0) -> HttpArchive:
+    """Serve all fetches from the archive in `directory` instead of the network."""
+    fetcher.http_archive = HttpArchive(directory, 'replay', latency_scale)
+    logger.info(f"Replaying {len(fetcher.http_archive)} recorded responses from {directory}")
+    return fetcher.http_archive
+
+
+def stop():
+    """Return to live fetching."""
+    fetcher.http_archive = None
+
+
+def configure_from_environment():
+    """Apply NEWS_HTTP_MODE / NEWS_HTTP_ARCHIVE / NEWS_REPLAY_LATENCY, if set."""
+    mode = os.environ.get('NEWS_HTTP_MODE', '')
+    directory = os.environ.get('NEWS_HTTP_ARCHIVE', '')
+    if not mode:
+        return
+    if not directory:
+        raise ValueError("NEWS_HTTP_MODE is set but NEWS_HTTP_ARCHIVE is not")
+    if mode == 'record':
+        start_recording(directory)
+    elif mode == 'replay':
+        start_replay(directory, float(os.environ.get('NEWS_REPLAY_LATENCY', '1.0')))
+    else:
+        raise ValueError(f"Unsupported NEWS_HTTP_MODE: {mode}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay news queries against an HTTP archive.")
+    parser.add_argument('mode', choices=('record', 'replay'))
+    parser.add_argument('companies', nargs='+')
+    parser.add_argument('--archive', required=True, help="archive directory")
+    parser.add_argument('--num-articles', type=int, default=10)
+    parser.add_argument('--serp-format', choices=('html', 'rss'), default=None,
+                        help="search results source (default: NEWS_SEARCH_FORMAT)")
+    parser.add_argument('--latency-scale', type=float, default=1.0,
+                        help="replay only: multiplier for recorded latencies (0 = none)")
+    args = parser.parse_args()
+
+    # Keep caches out of the measurement so every run performs the same fetches
+    import tempfile
+    os.environ['NEWS_CACHE_DIR'] = tempfile.mkdtemp(prefix='news-replay-cache-')
+    from utils import get_news_articles
+
+    if args.mode == 'record':
+        start_recording(args.archive)
+    else:
+        start_replay(args.archive, args.latency_scale)
+    for company in args.companies:
+        started = time.perf_counter()
+        articles = get_news_articles(company, args.num_articles, serp_format=args.serp_format)
+        print(f"{company}: {len(articles)} articles in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+"""Parsing of Bing News search results, from the HTML page or the RSS feed."""
+import io
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
+from typing import List, Optional, Tuple
+
+import lxml.html
+from dateutil import parser as date_parser
+from lxml import etree
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SearchResult:
+    """One news card from a Bing News results page (or item from the RSS feed)."""
+    url: str
+    title: str = ''
+    snippet: str = ''
+    source: str = ''
+    age: str = ''  # relative timestamp as shown on the card, e.g. "3h" or "2d"
+    published: str = ''  # exact ISO publish timestamp (RSS results only)
+
+    def published_at(self, now: datetime = None) -> Optional[datetime]:
+        """Local publish time from the feed timestamp or the card's age, or None if neither can be read."""
+        window = self.published_window(now)
+        return window[1] if window else None
+
+    def published_window(self, now: datetime = None) -> Optional[Tuple[datetime, datetime]]:
+        """Earliest and latest local publish time the result's metadata allows, or None if it has no date."""
+        if self.published:
+            try:
+                published = datetime.fromisoformat(self.published)
+                published = published.astimezone().replace(tzinfo=None) if published.tzinfo else published
+                return published, published
+            except ValueError:
+                pass
+        return age_window(self.age, now)
+
+
+# Units of the relative ages on news cards ("15m", "3h", "2d", "1w", "5 hours ago")
+_AGE = re.compile(r'^(\d+)\s*(m|mins?|minutes?|h|hrs?|hours?|d|days?|w|wks?|weeks?|mo|mos|mon|months?|y|yrs?|years?)'
+                  r'(?:\s+ago)?$')
+_AGE_UNITS = {'m': timedelta(minutes=1), 'h': timedelta(hours=1), 'd': timedelta(days=1), 'w': timedelta(weeks=1),
+              'mo': timedelta(days=30), 'y': timedelta(days=365)}
+_JUST_NOW = ('just now', 'now')
+
+
+def age_window(age: str, now: datetime = None) -> Optional[Tuple[datetime, datetime]]:
+    """
+    Turn a card's age into the earliest and latest time the article can have been
+    published. Relative ages count back from `now` and are truncated, so "2d" means
+    two to three days ago; older cards showing a date ("Mar 1, 2024") cover that
+    whole day, as does "Yesterday". Months and years are approximate. Returns None for
+    anything unrecognized.
+    """
+    age = ' '.join((age or '').lower().split())
+    if not age:
+        return None
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if age in _JUST_NOW:
+        return now - _AGE_UNITS['h'], now
+    if age == 'yesterday':
+        return today - timedelta(days=1), today - timedelta(microseconds=1)
+    match = _AGE.match(age)
+    if match:
+        count, unit = int(match.group(1)), match.group(2)
+        if unit.startswith('mo'):
+            step = _AGE_UNITS['mo']
+        elif unit.startswith('mi') or unit == 'm':
+            step = _AGE_UNITS['m']
+        else:
+            step = _AGE_UNITS[unit[0]]
+        return now - (count + 1) * step, now - count * step
+    try:
+        day = date_parser.parse(age, default=today)
+    except (ValueError, OverflowError):
+        return None
+    if day > now and day.year == now.year:
+        # Dates shown without a year ("Dec 30") are in the past
+        day = day.replace(year=day.year - 1)
+    return day, day + timedelta(days=1) - timedelta(microseconds=1)
+
+
+def parse_age(age: str, now: datetime = None) -> Optional[datetime]:
+    """Absolute time for a card's age ("3h", "2d", "Mar 1, 2024"), or None if it is unrecognized."""
+    window = age_window(age, now)
+    return window[1] if window else None
+
+
+def outside_interval(result: SearchResult, start_date: datetime = None, end_date: datetime = None,
+                     now: datetime = None) -> bool:
+    """
+    True if a search result's date shows its article can't fall within the interval
+    (whole days, as in utils.filter_by_date_range). Results without a readable date are kept.
+    """
+    if not (start_date and end_date):
+        return False
+    window = result.published_window(now)
+    if window is None:
+        return False
+    earliest, latest = window
+    start = datetime.combine(start_date, datetime.min.time())
+    end = datetime.combine(end_date, datetime.max.time())
+    return latest < start or earliest > end
+
+
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Compiled once; XPath evaluation happens in C inside lxml
+_NEWS_CARDS = etree.XPath(f"//div[{_has_class('news-card')}]")
+_TITLE_LINKS = etree.XPath(f"//a[{_has_class('title')}]")
+_NEWS_ITEMS = etree.XPath(f"//div[{_has_class('news-item')}]")
+_CARD_TITLE_LINK = etree.XPath(f".//a[{_has_class('title')}][1]")
+_CARD_FIRST_LINK = etree.XPath(".//a[@href][1]")
+_CARD_SNIPPET = etree.XPath(f".//div[{_has_class('snippet')}][1]")
+_CARD_SOURCE = etree.XPath(f".//div[{_has_class('source')}][1]")
+_SOURCE_NAME = etree.XPath(".//a[@aria-label][1]/@aria-label")
+_SOURCE_AGE = etree.XPath(".//span[@aria-label][last()]")
+
+
+def _text(element) -> str:
+    return ' '.join(element.text_content().split()) if element is not None else ''
+
+
+def _first(elements):
+    return elements[0] if elements else None
+
+
+def _parse_card(card) -> SearchResult:
+    """Extract link, title, snippet, source and age from a news card element."""
+    link = _first(_CARD_TITLE_LINK(card)) if card.tag != 'a' else card
+    if link is None:
+        link = _first(_CARD_FIRST_LINK(card))
+    url = card.get('url') or (link.get('href') if link is not None else '')
+
+    snippet_div = _first(_CARD_SNIPPET(card))
+    source_div = _first(_CARD_SOURCE(card))
+    source = card.get('data-author') or ''
+    age = ''
+    if source_div is not None:
+        source = source or _first(_SOURCE_NAME(source_div)) or ''
+        age = _text(_first(_SOURCE_AGE(source_div)))
+    return SearchResult(
+        url=url or '',
+        title=card.get('data-title') or _text(link),
+        snippet=(snippet_div.get('title') or _text(snippet_div)) if snippet_div is not None else '',
+        source=source,
+        age=age,
+    )
+
+
+def parse_search_results(html: str) -> List[SearchResult]:
+    """
+    Parse a Bing News results page in one lxml pass.
+    Full news cards are preferred; bare `a.title` links and `div.news-item`
+    blocks are used as fallbacks for older or reduced markup.
+    """
+    if not html or not html.strip():
+        return []
+    try:
+        doc = lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError) as e:
+        logger.warning(f"Could not parse search results page: {str(e)}")
+        return []
+
+    cards = _NEWS_CARDS(doc) or _TITLE_LINKS(doc) or _NEWS_ITEMS(doc)
+    results = []
+    for card in cards:
+        result = _parse_card(card)
+        if result.url:
+            results.append(result)
+    return results
+
+
+_XML_DECLARATION = re.compile(r'^\s*<\?xml[^>]*\?>')
+
+
+def _rss_date(value: str) -> str:
+    try:
+        return parsedate_to_datetime(value).isoformat()
+    except (TypeError, ValueError, IndexError):
+        return ''
+
+
+def parse_rss_results(xml: str) -> List[SearchResult]:
+    """
+    Parse a Bing News RSS feed (format=rss) with a streaming parser.
+    Each <item> is turned into a result as soon as it has been read and then
+    discarded, so memory stays flat however long the feed is.
+    """
+    if not xml or not xml.strip():
+        return []
+    # The text is already decoded; drop the declaration so its encoding isn't applied twice
+    source = io.BytesIO(_XML_DECLARATION.sub('', xml, count=1).encode('utf-8'))
+    results = []
+    try:
+        for _, item in etree.iterparse(source, events=('end',), tag='item', recover=True):
+            fields = {etree.QName(child).localname.lower(): (child.text or '').strip()
+                      for child in item if isinstance(child.tag, str)}
+            if fields.get('link'):
+                results.append(SearchResult(
+                    url=fields['link'],
+                    title=' '.join(fields.get('title', '').split()),
+                    snippet=' '.join(fields.get('description', '').split()),
+                    source=fields.get('source', ''),
+                    published=_rss_date(fields.get('pubdate', '')),
+                ))
+            item.clear()
+            while item.getprevious() is not None:
+                del item.getparent()[0]
+    except etree.XMLSyntaxError as e:
+        logger.warning(f"Could not parse search results feed: {str(e)}")
+    return results
@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+
+import fetcher
+from fetcher import PRIORITY_BACKGROUND, PRIORITY_INTERACTIVE, PrioritySlots, TokenBucket
+
+
+async def settle():
+    """Let every task that can make progress do so."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def waiter(slots: PrioritySlots, granted: list, name: str, priority: int, flow: str = ''):
+    async def run():
+        await slots.acquire(priority, flow)
+        granted.append(name)
+    return asyncio.ensure_future(run())
+
+
+def test_interactive_waiter_jumps_queued_background():
+    async def scenario():
+        slots = PrioritySlots(2)
+        await slots.acquire(PRIORITY_BACKGROUND)
+        await slots.acquire(PRIORITY_BACKGROUND)
+        granted = []
+        waiter(slots, granted, 'b1', PRIORITY_BACKGROUND)
+        waiter(slots, granted, 'b2', PRIORITY_BACKGROUND)
+        await settle()
+        waiter(slots, granted, 'i1', PRIORITY_INTERACTIVE)
+        await settle()
+        assert granted == []
+        for _ in range(3):
+            slots.release()
+            await settle()
+        assert granted == ['i1', 'b1', 'b2']
+
+    asyncio.run(scenario())
+
+
+def test_reserved_slots_are_never_given_to_background():
+    async def scenario():
+        slots = PrioritySlots(3, reserved=1)
+        granted = []
+        for name in ('b1', 'b2', 'b3'):
+            waiter(slots, granted, name, PRIORITY_BACKGROUND)
+        await settle()
+        assert granted == ['b1', 'b2'] and slots.in_use == 2
+        waiter(slots, granted, 'i1', PRIORITY_INTERACTIVE)
+        await settle()
+        assert granted == ['b1', 'b2', 'i1'] and slots.in_use == 3
+        slots.release()  # i1 done: the reserved slot frees up, but not for b3
+        await settle()
+        assert granted == ['b1', 'b2', 'i1'] and slots.in_use == 2
+        slots.release()
+        await settle()
+        assert granted == ['b1', 'b2', 'i1', 'b3'] and slots.in_use == 2
+
+    asyncio.run(scenario())
+
+
+def test_flows_are_interleaved():
+    async def scenario():
+        slots = PrioritySlots(1)
+        await slots.acquire(PRIORITY_BACKGROUND)
+        granted = []
+        for i in range(3):
+            waiter(slots, granted, f'a{i}', PRIORITY_BACKGROUND, 'A')
+        for i in range(3):
+            waiter(slots, granted, f'b{i}', PRIORITY_BACKGROUND, 'B')
+        await settle()
+        for _ in range(6):
+            slots.release()
+            await settle()
+        assert granted == ['a0', 'b0', 'a1', 'b1', 'a2', 'b2']
+        assert slots.in_use == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_does_not_take_a_slot():
+    async def scenario():
+        slots = PrioritySlots(1)
+        await slots.acquire()
+        granted = []
+        cancelled = waiter(slots, granted, 'cancelled', PRIORITY_INTERACTIVE)
+        waiter(slots, granted, 'next', PRIORITY_INTERACTIVE)
+        await settle()
+        cancelled.cancel()
+        await settle()
+        assert slots.in_use == 1
+        slots.release()
+        await settle()
+        assert granted == ['next'] and slots.in_use == 1
+        slots.release()
+        assert slots.in_use == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiter_cancelled_as_it_is_granted_releases_the_slot():
+    async def scenario():
+        slots = PrioritySlots(1)
+        await slots.acquire()
+        granted = []
+        task = waiter(slots, granted, 'raced', PRIORITY_INTERACTIVE)
+        await settle()
+        slots.release()  # grants the slot to the waiting task...
+        task.cancel()  # ...which is cancelled before it gets to run
+        await settle()
+        assert task.cancelled() and granted == []
+        assert slots.in_use == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(fetcher.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def test_try_take_does_not_reserve_when_empty(clock):
+    bucket = TokenBucket(rate=2.0, capacity=1)
+    assert bucket.try_take() == 0.0
+    assert bucket.try_take() == pytest.approx(0.5)
+    assert bucket.try_take() == pytest.approx(0.5)  # asking again didn't push the wait back
+    clock[0] += 0.25
+    assert bucket.try_take() == pytest.approx(0.25)
+    clock[0] += 0.25
+    assert bucket.try_take() == 0.0
+    assert bucket.try_take() == pytest.approx(0.5)
+
+
+def test_reserve_queues_behind_earlier_reservations(clock):
+    bucket = TokenBucket(rate=2.0, capacity=1)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == pytest.approx(0.5)
+    assert bucket.reserve() == pytest.approx(1.0)
+    assert bucket.try_take() == pytest.approx(1.5)  # background work waits for the reserved tokens too
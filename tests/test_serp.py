@@ -0,0 +1,92 @@
+from datetime import date, datetime
+
+import pytest
+
+from serp import SearchResult, age_window, outside_interval, parse_rss_results
+
+NOW = datetime(2024, 10, 14, 12, 0)
+
+
+def outside(age, start, end):
+    return outside_interval(SearchResult(url='https://example.com/a', age=age), start, end, now=NOW)
+
+
+def test_relative_age_is_truncated():
+    assert age_window('2d', NOW) == (datetime(2024, 10, 11, 12, 0), datetime(2024, 10, 12, 12, 0))
+    assert age_window('5 hours ago', NOW) == (datetime(2024, 10, 14, 6, 0), datetime(2024, 10, 14, 7, 0))
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    (date(2024, 10, 12), date(2024, 10, 14), False),  # latest possible day
+    (date(2024, 10, 11), date(2024, 10, 11), False),  # earliest possible day
+    (date(2024, 10, 13), date(2024, 10, 14), True),
+    (date(2024, 10, 1), date(2024, 10, 10), True),
+])
+def test_two_days_at_interval_edges(start, end, expected):
+    assert outside('2d', start, end) is expected
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    (date(2024, 9, 14), date(2024, 10, 14), False),
+    (date(2024, 9, 15), date(2024, 10, 14), True),
+    (date(2024, 8, 1), date(2024, 8, 15), False),
+    (date(2024, 8, 1), date(2024, 8, 14), True),
+])
+def test_one_month_at_interval_edges(start, end, expected):
+    assert age_window('1mo', NOW) == (datetime(2024, 8, 15, 12, 0), datetime(2024, 9, 14, 12, 0))
+    assert outside('1mo', start, end) is expected
+
+
+@pytest.mark.parametrize('start, end, expected', [
+    (date(2024, 3, 1), date(2024, 3, 1), False),
+    (date(2024, 2, 1), date(2024, 3, 1), False),
+    (date(2024, 3, 1), date(2024, 3, 31), False),
+    (date(2024, 3, 2), date(2024, 3, 31), True),
+    (date(2024, 2, 1), date(2024, 2, 29), True),
+])
+def test_absolute_date_at_interval_edges(start, end, expected):
+    assert outside('Mar 1, 2024', start, end) is expected
+
+
+def test_date_without_year_is_in_the_past():
+    assert age_window('Dec 30', NOW)[0] == datetime(2023, 12, 30)
+    assert age_window('Oct 1', NOW)[0] == datetime(2024, 10, 1)
+
+
+@pytest.mark.parametrize('age', ['Yesterday', 'just now', 'Just Now'])
+def test_recent_words_are_kept(age):
+    assert age_window(age, NOW) is not None
+    assert not outside(age, date(2024, 10, 13), date(2024, 10, 14))
+
+
+def test_yesterday_covers_the_previous_day():
+    assert outside('Yesterday', date(2024, 10, 13), date(2024, 10, 13)) is False
+    assert outside('Yesterday', date(2024, 10, 14), date(2024, 10, 14)) is True
+
+
+@pytest.mark.parametrize('age', ['', 'sponsored', 'Live'])
+def test_unreadable_ages_are_kept(age):
+    assert age_window(age, NOW) is None
+    assert not outside(age, date(2020, 1, 1), date(2020, 1, 2))
+
+
+def test_no_interval_keeps_everything():
+    assert not outside('3y', None, None)
+
+
+def test_rss_publish_time_is_exact():
+    feed = (
+        '<?xml version="1.0" encoding="utf-8" ?>'
+        '<rss version="2.0" xmlns:News="https://www.bing.com/news/search?q=&amp;format=rss"><channel>'
+        '<item><title>Acme  beats</title><link>https://example.com/a</link><description>Up</description>'
+        '<pubDate>Mon, 14 Oct 2024 10:00:00 GMT</pubDate><News:Source>Wire</News:Source></item>'
+        '<item><title>No link</title></item>'
+        '<item><title>No date</title><link>https://example.com/b</link></item>'
+        '</channel></rss>'
+    )
+    results = parse_rss_results(feed)
+    assert [(r.url, r.title, r.source) for r in results] == [
+        ('https://example.com/a', 'Acme beats', 'Wire'), ('https://example.com/b', 'No date', '')]
+    earliest, latest = results[0].published_window(NOW)
+    assert earliest == latest
+    assert outside_interval(results[1], date(2020, 1, 1), date(2020, 1, 2), now=NOW) is False
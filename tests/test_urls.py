@@ -0,0 +1,87 @@
+import base64
+from urllib.parse import quote
+
+import pytest
+
+from urls import canonicalize_url, clean_url, unwrap_redirect
+
+TARGET = 'https://www.example.com/news/story?id=5'
+
+
+def test_bing_apiclick_is_unwrapped():
+    wrapped = f"https://www.bing.com/news/apiclick.aspx?ref=FexRss&aid=&tid=1&url={quote(TARGET, safe='')}&c=1"
+    assert unwrap_redirect(wrapped) == TARGET
+
+
+def test_bing_ck_is_unwrapped():
+    encoded = base64.urlsafe_b64encode(TARGET.encode('utf-8')).decode('ascii').rstrip('=')
+    wrapped = f"https://www.bing.com/ck/a?!&&p=abc&ptn=3&u=a1{encoded}&ntb=1"
+    assert unwrap_redirect(wrapped) == TARGET
+
+
+@pytest.mark.parametrize('wrapped', [
+    f"https://www.bing.com/ck/a?u=b1{base64.urlsafe_b64encode(TARGET.encode()).decode()}",
+    "https://www.bing.com/ck/a?u=a1!!!not-base64",
+    "https://www.bing.com/news/apiclick.aspx?url=javascript:alert(1)",
+])
+def test_unreadable_wrappers_are_left_alone(wrapped):
+    assert unwrap_redirect(wrapped) == wrapped
+
+
+def test_nested_wrappers_are_unwrapped():
+    inner = f"https://www.google.com/url?q={quote(TARGET, safe='')}"
+    outer = f"https://l.facebook.com/l.php?u={quote(inner, safe='')}"
+    assert unwrap_redirect(outer) == TARGET
+
+
+def test_clean_url_strips_only_unambiguous_trackers():
+    url = 'https://www.example.com/news/story?id=5&src=rss&utm_source=x&fbclid=1&ref=home#comments'
+    assert clean_url(url) == 'https://www.example.com/news/story?id=5&src=rss&ref=home'
+
+
+@pytest.mark.parametrize('url', [
+    'https://example.com/news/story?id=5',
+    'http://www.example.com/news/story/?id=5',
+    'https://m.example.com/news/story?id=5&utm_campaign=feed',
+    'https://amp.example.com/news/story?id=5',
+    'https://www.example.com/news/story/amp?id=5',
+    'https://www.example.com/amp/news/story?id=5',
+    'https://www.example.com/news/story?outputType=amp&id=5',
+    'https://www.example.com:443/news/story?ref=home&id=5&share_id=9',
+])
+def test_variants_share_a_canonical_url(url):
+    assert canonicalize_url(url) == 'https://example.com/news/story?id=5'
+
+
+def test_amp_html_suffix_is_collapsed():
+    assert canonicalize_url('https://www.example.com/2024/story.amp.html') == 'https://example.com/2024/story.html'
+
+
+@pytest.mark.parametrize('url', [
+    'https://example.com/news/story?id=6',
+    'https://example.com/news/story?id=5&page=2',
+    'https://example.com/news/other?id=5',
+    'https://example.com:8443/news/story?id=5',
+    'https://news.example.com/news/story?id=5',
+])
+def test_real_differences_survive(url):
+    assert canonicalize_url(url) != 'https://example.com/news/story?id=5'
+
+
+def test_query_order_does_not_matter():
+    assert (canonicalize_url('https://example.com/a?page=2&id=5')
+            == canonicalize_url('https://example.com/a?id=5&page=2')
+            == 'https://example.com/a?id=5&page=2')
+
+
+def test_short_hosts_keep_their_prefix():
+    assert canonicalize_url('https://m.com/story') == 'https://m.com/story'
+
+
+@pytest.mark.parametrize('url', [
+    'https://ex.com/a?12345',
+    'https://ex.com/a?path=%7Euser&q=a+b',
+    'https://ex.com/a?x=1;y=2',
+])
+def test_clean_url_leaves_untracked_queries_alone(url):
+    assert clean_url(url) == url
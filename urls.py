@@ -0,0 +1,127 @@
+"""URL helpers shared by the fetch pipeline and its caches.
+
+Two levels of normalization are used:
+  * clean_url() unwraps redirect links and strips unambiguous tracking
+    parameters (utm_*, fbclid, ...). The result is still safe to fetch.
+  * canonicalize_url() additionally drops generic names that are usually,
+    but not always, tracking (ref, src, ...) and normalizes scheme, host and
+    AMP/mobile variants. It is used as the identity of an article for
+    deduplication and cache keys, not for fetching.
+"""
+import base64
+import binascii
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Redirect wrappers: host -> (path prefix, query parameters that carry the target URL)
+REDIRECT_WRAPPERS = {
+    'www.bing.com': ('/news/apiclick.aspx', ('url',)),
+    'bing.com': ('/news/apiclick.aspx', ('url',)),
+    'www.google.com': ('/url', ('url', 'q')),
+    'google.com': ('/url', ('url', 'q')),
+    'l.facebook.com': ('/l.php', ('u',)),
+    't.co': None,  # opaque short links; left alone
+}
+
+# Parameters that only ever carry tracking; stripped from fetched URLs
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'mc_cid', 'mc_eid', 'ocid', 'cmpid',
+    'smid', 'smtyp', 'soc_src', 'soc_trk', 'ito', 'icid', 'ns_mchannel', 'ns_source', 'ns_campaign',
+    'ns_linkname', 'ns_fee', 'mkt_tok', '_ga', '_gl', 'guccounter', 'guce_referrer', 'guce_referrer_sig',
+    'sr_share', 'yptr', 'ref_src', 'ftag',
+}
+TRACKING_PREFIXES = ('utm_', 'pk_', 'hsa_')
+
+# Generic names that are tracking on most news sites but real parameters on some;
+# ignored for article identity only, never stripped from the URL that is fetched
+AMBIGUOUS_TRACKING_PARAMS = {'cmp', 'taid', 'referrer', 'ref', 'src', 'form', 'mod', 'partner'}
+AMBIGUOUS_TRACKING_PREFIXES = ('at_', 'share_')
+
+# Host prefixes that serve the same story as the bare domain
+HOST_VARIANT_PREFIXES = ('www.', 'm.', 'mobile.', 'amp.')
+
+# Query parameters that only select the AMP rendering of a page
+AMP_PARAMS = {'amp', 'outputtype', 'amp_js_v', 'usqp'}
+
+_AMP_SUFFIX = re.compile(r'/amp/?$|\.amp(?=\.html?$)|\.amp$', re.IGNORECASE)
+_AMP_PREFIX = re.compile(r'^/amp(?=/)', re.IGNORECASE)
+
+
+def _decode_bing_ck(value: str) -> str:
+    """Bing /ck/a links carry the target as 'a1' + unpadded base64url."""
+    if not value.startswith('a1'):
+        return ''
+    encoded = value[2:]
+    try:
+        return base64.urlsafe_b64decode(encoded + '=' * (-len(encoded) % 4)).decode('utf-8')
+    except (binascii.Error, UnicodeDecodeError):
+        return ''
+
+
+def unwrap_redirect(url: str, max_depth: int = 3) -> str:
+    """Follow known redirect wrappers (Bing click-tracking, Google, Facebook) to the target URL."""
+    for _ in range(max_depth):
+        parts = urlsplit(url)
+        host = (parts.hostname or '').lower()
+        params = dict(parse_qsl(parts.query, keep_blank_values=True))
+        target = ''
+        if host.endswith('bing.com') and parts.path.startswith('/ck/a'):
+            target = _decode_bing_ck(params.get('u', ''))
+        elif REDIRECT_WRAPPERS.get(host):
+            path_prefix, names = REDIRECT_WRAPPERS[host]
+            if parts.path.lower().startswith(path_prefix):
+                target = next((params[name] for name in names if params.get(name)), '')
+        if not target.startswith(('http://', 'https://')):
+            return url
+        url = target
+    return url
+
+
+def _is_tracking_param(name: str) -> bool:
+    lowered = name.lower()
+    return lowered in TRACKING_PARAMS or lowered.startswith(TRACKING_PREFIXES)
+
+
+def _is_ambiguous_tracking_param(name: str) -> bool:
+    lowered = name.lower()
+    return lowered in AMBIGUOUS_TRACKING_PARAMS or lowered.startswith(AMBIGUOUS_TRACKING_PREFIXES)
+
+
+def clean_url(url: str) -> str:
+    """
+    Unwrap redirects and drop unambiguous tracking parameters and fragments. The result is safe to fetch:
+    the query string is only re-encoded when a tracking parameter was actually removed.
+    """
+    parts = urlsplit(unwrap_redirect(url.strip()))
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    query = [(name, value) for name, value in params if not _is_tracking_param(name)]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path,
+                       urlencode(query) if len(query) < len(params) else parts.query, ''))
+
+
+def canonicalize_url(url: str) -> str:
+    """Return the canonical identity of `url`, used for deduplication and as a cache key.
+
+    On top of clean_url(), the scheme is forced to https, the host is lowercased
+    and stripped of www./m./amp. prefixes and default ports, AMP paths, query
+    switches and ambiguous tracking parameters are removed, query parameters
+    are sorted and trailing slashes dropped.
+    """
+    parts = urlsplit(clean_url(url))
+    host = (parts.hostname or '').lower()
+    for prefix in HOST_VARIANT_PREFIXES:
+        if host.startswith(prefix) and host.count('.') > 1:
+            host = host[len(prefix):]
+            break
+    if parts.port and parts.port != DEFAULT_PORTS.get(parts.scheme.lower()):
+        host = f"{host}:{parts.port}"
+
+    path = _AMP_PREFIX.sub('', _AMP_SUFFIX.sub('', parts.path)) or '/'
+    if len(path) > 1:
+        path = path.rstrip('/')
+    query = sorted((name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+                   if name.lower() not in AMP_PARAMS and not _is_ambiguous_tracking_param(name))
+    return urlunsplit(('https', host, path, urlencode(query), ''))
+
@@ -1,32 +1,273 @@
-import requests
-from bs4 import BeautifulSoup
-from newspaper import Article
+import asyncio
+import atexit
+import contextvars
+import heapq
+import aiohttp
 import pandas as pd
 import nltk
-from typing import List, Dict
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 import logging
+import multiprocessing
+import os
 from datetime import datetime
-import time
-import random
+from collections import OrderedDict
+from dataclasses import asdict
+
+from cache import ArticleCache, NegativeCache, SearchCache, SEARCH_CACHE_DISK, CACHE_DIR
+from dedup import NearDuplicateIndex
+from fetcher import (CircuitOpenError, DeadlineExceeded, ResponseTooLargeError, UnsupportedContentError, fetch,
+                     fetch_text, is_recording, iterate_async, iterate_sync, run_on_engine, run_sync, set_deadline)
+from extractors import EXTRACTORS
+from inference import MicroBatcher
+import replay
+from serp import SearchResult, outside_interval, parse_rss_results, parse_search_results
+from urls import canonicalize_url, clean_url
+from workers import CPU_WORKERS, CpuPool, extract_article, summarize_article
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Download required NLTK data
-nltk.download('punkt')
+# Articles processed concurrently per query; per-host and global fetch limits live in fetcher.scheduler
+MAX_CONCURRENT_DOWNLOADS = 8
+
+# Bing News result paging; the base URL can point at a stand-in server (see loadtest/)
+SEARCH_BASE_URL = os.environ.get('NEWS_SEARCH_BASE_URL', 'https://www.bing.com')
+RESULTS_PER_PAGE = 10
+MAX_RESULT_PAGES = 20
+
+# Search results source: the 'html' results page or Bing's 'rss' feed for the same query,
+# a much smaller payload with exact publish timestamps that parses in a single streaming pass
+SEARCH_FORMAT = os.environ.get('NEWS_SEARCH_FORMAT', 'html')
+SEARCH_FORMATS = ('html', 'rss')
+RSS_CONTENT_TYPES = ('application/rss+xml', 'application/xml', 'text/xml')
+
+# Article extraction backend: 'newspaper' (default) or the leaner 'lxml' (see extractors.py)
+ARTICLE_EXTRACTOR = os.environ.get('NEWS_EXTRACTOR', 'newspaper')
+if ARTICLE_EXTRACTOR not in EXTRACTORS:
+    raise ValueError(f"Unknown article extractor '{ARTICLE_EXTRACTOR}'; choose from {', '.join(EXTRACTORS)}")
 
-def get_news_articles(company_name: str, num_articles: int = 10, start_date: datetime = None, end_date: datetime = None) -> List[Dict]:
+# Worker processes for the CPU stage (extraction, fingerprinting, summaries); see workers.py
+cpu_pool = CpuPool(CPU_WORKERS, ARTICLE_EXTRACTOR)
+atexit.register(cpu_pool.shutdown)
+
+def _setup_process():
+    """
+    One-time setup of the main process. CPU workers re-import the main module (and
+    with it this one) when they start, so this is skipped in worker processes.
+    """
+    # Download required NLTK data
+    nltk.download('punkt')
+    # NEWS_HTTP_MODE=record|replay switches all fetches to an on-disk HTTP archive
+    replay.configure_from_environment()
+    # Spawn and warm up the CPU workers now rather than inside the first query's deadline
+    cpu_pool.start()
+
+# A spawned worker already has its own name (but no parent_process()) while it imports the main module
+if multiprocessing.current_process().name == 'MainProcess':
+    _setup_process()
+
+# Persistent article cache shared by all queries
+article_cache = ArticleCache()
+
+# Article URLs that recently failed, so they aren't retried on every run. Only failures
+# that say something about the URL itself are recorded: timeouts, 429 and 5xx are the
+# domain breaker's business, and local errors (NLP data, worker pool) aren't the URL's fault.
+failed_urls = NegativeCache()
+PERMANENT_FAILURE_STATUSES = (404, 410)
+
+# Near-duplicate (syndicated) article bodies seen by this process, and the
+# analysis shared by each cluster
+near_duplicates = NearDuplicateIndex()
+MAX_SHARED_ANALYSES = 10000
+_cluster_analyses = OrderedDict()
+
+# Short-lived cache of Bing result links, so reruns of the same query skip the search round-trip
+search_cache = SearchCache(directory=os.path.join(CACHE_DIR, 'search') if SEARCH_CACHE_DISK else None)
+
+# Fields of an article record that need the summary/keyword NLP pass
+LAZY_FIELDS = ('summary', 'topics')
+
+# Article fields requested by the query running in the current task (None: all).
+# Summary and keywords are only computed up front when 'summary' or 'topics' is requested.
+requested_fields = contextvars.ContextVar('requested_fields', default=None)
+
+def _set_requested_fields(fields: Optional[Iterable[str]]):
+    requested_fields.set(frozenset(fields) if fields is not None else None)
+
+def _summaries_requested() -> bool:
+    fields = requested_fields.get()
+    return fields is None or any(key in fields for key in LAZY_FIELDS)
+
+class ArticleList(list):
+    """A list of article dictionaries; `partial` is True when a deadline cut the query short."""
+
+    def __init__(self, articles=(), partial: bool = False):
+        super().__init__(articles)
+        self.partial = partial
+
+def get_news_articles(company_name: str, num_articles: int = 10, start_date: datetime = None, end_date: datetime = None,
+                      deadline: float = None, fields: Iterable[str] = None, serp_format: str = None,
+                      lite: bool = False) -> ArticleList:
     """
     Fetch news articles related to the given company name from Bing News.
     Returns a list of dictionaries containing article information.
+    If `deadline` (seconds) is given, whatever articles are complete when it
+    expires are returned and the result is marked `partial`.
+    If `fields` is given and includes neither 'summary' nor 'topics', those are
+    computed only when first accessed on an article (see LazyArticle).
+    `serp_format` picks the search results source, 'html' or 'rss' (default: NEWS_SEARCH_FORMAT).
+    With `lite=True` no article is downloaded: records are built from the search
+    results alone (see build_lite_record) and get_full_article loads one on demand.
+    """
+    return run_sync(_news_articles(company_name, num_articles, start_date, end_date, deadline, fields, serp_format,
+                                   lite))
+
+async def get_news_articles_async(company_name: str, num_articles: int = 10, start_date: datetime = None, end_date: datetime = None,
+                                  deadline: float = None, fields: Iterable[str] = None, serp_format: str = None,
+                                  lite: bool = False) -> ArticleList:
+    """Async version of get_news_articles; can be awaited from any event loop."""
+    return await run_on_engine(_news_articles(company_name, num_articles, start_date, end_date, deadline, fields,
+                                              serp_format, lite))
+
+def iter_news_articles(company_name: str, num_articles: int = 10, start_date: datetime = None, end_date: datetime = None,
+                       fields: Iterable[str] = None, serp_format: str = None) -> Iterator[Dict]:
+    """
+    Yield news articles one by one as soon as each is processed (completion order).
+    Stops scheduling downloads once `num_articles` have been yielded; closing the
+    iterator early cancels any downloads still in flight. `fields` and `serp_format` work as in get_news_articles.
+    """
+    return iterate_sync(_articles_only(_news_stream(company_name, num_articles, start_date, end_date, fields,
+                                                    serp_format)))
+
+def iter_news_articles_async(company_name: str, num_articles: int = 10, start_date: datetime = None, end_date: datetime = None,
+                             fields: Iterable[str] = None, serp_format: str = None) -> AsyncIterator[Dict]:
+    """Async version of iter_news_articles, for use with `async for` on any event loop."""
+    return iterate_async(_articles_only(_news_stream(company_name, num_articles, start_date, end_date, fields,
+                                                     serp_format)))
+
+async def _news_articles(company_name: str, num_articles: int, start_date: datetime, end_date: datetime,
+                         deadline: float = None, fields: Iterable[str] = None, serp_format: str = None,
+                         lite: bool = False) -> ArticleList:
+    results = []
+    
+    async def collect():
+        if lite:
+            pairs = _lite_stream(company_name, num_articles, start_date, end_date, serp_format)
+        else:
+            pairs = _news_stream(company_name, num_articles, start_date, end_date, fields, serp_format, ranked=True)
+        async for pair in pairs:
+            results.append(pair)
+    
+    # Fetches started by the collector inherit the deadline and size their timeouts to it
+    budget = set_deadline(deadline)
+    partial = False
+    try:
+        await asyncio.wait_for(collect(), timeout=deadline)
+        # Requests refused for lack of time also mean we may have missed articles
+        partial = budget is not None and budget.exhausted and len(results) < num_articles
+    except asyncio.TimeoutError:
+        partial = True
+    if partial:
+        logger.warning(f"Deadline of {deadline}s reached with {len(results)} of {num_articles} articles for '{company_name}'")
+    # Keep the top-ranked successes, in search result order rather than completion order
+    ranked = sorted(results, key=lambda pair: pair[0])[:num_articles]
+    return ArticleList([article for _, article in ranked], partial=partial)
+
+async def _news_stream(company_name: str, num_articles: int, start_date: datetime, end_date: datetime,
+                       fields: Iterable[str] = None, serp_format: str = None,
+                       ranked: bool = False) -> AsyncIterator[Tuple[int, Dict]]:
+    """
+    Yield (result rank, article) pairs until `num_articles` articles have succeeded.
+    With `ranked`, keep going until the top `num_articles` successes are known (see _stream_articles).
     """
-    # Try to fetch up to 3x the requested number to account for failures
-    articles = get_bing_news_articles(company_name, num_articles * 3, start_date, end_date)
-    return articles[:num_articles]
+    # Article tasks spawned below inherit the requested fields
+    _set_requested_fields(fields)
+    max_retries = 3
+    retry_delay = 2
+    
+    try:
+        for attempt in range(max_retries):
+            first_page = await search_results(company_name, start_date, end_date, serp_format=serp_format)
+            
+            if not first_page:
+                logger.warning("No news cards found in the response")
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(retry_delay)
+                    continue
+                return
+            
+            # Try up to 3x the requested number of candidates to account for failures
+            candidates = _candidate_urls(company_name, start_date, end_date, num_articles * 3, first_page, serp_format)
+            produced = 0
+            async for pair in _stream_articles(candidates, MAX_CONCURRENT_DOWNLOADS, limit=num_articles, ranked=ranked):
+                produced += 1
+                yield pair
+            
+            if produced:
+                break
+    
+    except Exception as e:
+        logger.error(f"Error fetching from Bing News: {str(e)}")
 
-def get_bing_news_articles(company_name: str, num_articles: int, start_date: datetime = None, end_date: datetime = None) -> List[Dict]:
-    """Fetch articles from Bing News search results."""
+async def _lite_stream(company_name: str, num_articles: int, start_date: datetime, end_date: datetime,
+                       serp_format: str = None) -> AsyncIterator[Tuple[int, Dict]]:
+    """Yield (result rank, article) pairs built from search results only, paging just until `num_articles` are found."""
+    seen = set()
+    produced = 0
+    try:
+        for page in range(MAX_RESULT_PAGES):
+            cards = []
+            for result in await search_results(company_name, start_date, end_date, page, serp_format):
+                key = canonicalize_url(result.url)
+                if key not in seen and result.title:
+                    seen.add(key)
+                    cards.append(result)
+            if not cards:
+                if not produced:
+                    logger.warning("No news cards found in the response")
+                return
+            cards = [result for result in cards if not outside_interval(result, start_date, end_date)]
+            
+            # Scored together, so a page costs one batch of sentiment inference
+            cards = cards[:num_articles - produced]
+            sentiments = await asyncio.gather(*(sentiment_batcher.submit(f"{result.title}\n{result.snippet}")
+                                                for result in cards))
+            for result, sentiment in zip(cards, sentiments):
+                yield produced, build_lite_record(result, sentiment)
+                produced += 1
+            if produced >= num_articles:
+                return
+    
+    except Exception as e:
+        logger.error(f"Error fetching from Bing News: {str(e)}")
+
+async def _articles_only(pairs: AsyncIterator[Tuple[int, Dict]]) -> AsyncIterator[Dict]:
+    try:
+        async for _, article in pairs:
+            yield article
+    finally:
+        await pairs.aclose()
+
+def get_bing_news_articles(company_name: str, num_articles: int, start_date: datetime = None, end_date: datetime = None,
+                           max_workers: int = MAX_CONCURRENT_DOWNLOADS, fields: Iterable[str] = None) -> List[Dict]:
+    """
+    Fetch articles from Bing News search results, downloading up to `max_workers` articles at once.
+    `fields` works as in get_news_articles.
+    """
+    return run_sync(_bing_news_articles(company_name, num_articles, start_date, end_date, max_workers, fields))
+
+async def get_bing_news_articles_async(company_name: str, num_articles: int, start_date: datetime = None, end_date: datetime = None,
+                                       max_workers: int = MAX_CONCURRENT_DOWNLOADS, fields: Iterable[str] = None) -> List[Dict]:
+    """Async version of get_bing_news_articles; can be awaited from any event loop."""
+    return await run_on_engine(_bing_news_articles(company_name, num_articles, start_date, end_date, max_workers, fields))
+
+def build_search_url(company_name: str, start_date: datetime = None, end_date: datetime = None, page: int = 0,
+                     serp_format: str = 'html') -> str:
+    """
+    Build the Bing News search URL for a company, optional date interval and result page (0-based).
+    `serp_format='rss'` asks for the RSS feed of the same results instead of the HTML page.
+    """
     search_query = company_name.replace(' ', '+')
     
     # Add time range to the URL if provided
@@ -35,83 +276,121 @@ def get_bing_news_articles(company_name: str, num_articles: int, start_date: dat
         # Convert dates to Bing's format (e.g., "2024-01-01..2024-01-31")
         time_range = f"&qft=interval%3d%22{start_date.strftime('%Y-%m-%d')}..{end_date.strftime('%Y-%m-%d')}%22"
     
-    url = f"https://www.bing.com/news/search?q={search_query}{time_range}&FORM=HDRSC6"
+    # Bing pages through results with a 1-based offset of the first result
+    offset = f"&first={page * RESULTS_PER_PAGE + 1}" if page else ""
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'en-US,en;q=0.5',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-    }
+    if serp_format == 'rss':
+        return f"{SEARCH_BASE_URL}/news/search?q={search_query}{time_range}{offset}&format=rss"
+    return f"{SEARCH_BASE_URL}/news/search?q={search_query}{time_range}{offset}&FORM=HDRSC6"
+
+async def search_results(company_name: str, start_date: datetime = None, end_date: datetime = None,
+                         page: int = 0, serp_format: str = None) -> List[SearchResult]:
+    """
+    Return the news cards on a Bing News results page (or the items of its RSS feed),
+    reusing recent results from the search cache.
+    """
+    serp_format = serp_format or SEARCH_FORMAT
+    if serp_format not in SEARCH_FORMATS:
+        raise ValueError(f"Unknown search results format '{serp_format}'; choose from {', '.join(SEARCH_FORMATS)}")
+    key = search_cache.make_key(company_name, start_date, end_date, page, serp_format)
+    # With NEWS_SEARCH_CACHE_DISK the cache reads and writes files; keep that off the event loop
+    loop = asyncio.get_running_loop()
+    cached = None if is_recording() else await loop.run_in_executor(None, search_cache.get, key)
+    if cached is not None:
+        return [SearchResult(**result) for result in cached]
     
+    url = build_search_url(company_name, start_date, end_date, page, serp_format)
+    if serp_format == 'rss':
+        feed = await fetch_text(url, accept_types=RSS_CONTENT_TYPES)
+        results = await loop.run_in_executor(None, parse_rss_results, feed)
+    else:
+        html = await fetch_text(url)
+        results = await loop.run_in_executor(None, parse_search_results, html)
+    if results:
+        await loop.run_in_executor(None, search_cache.put, key, [asdict(result) for result in results])
+    return results
+
+async def search_article_urls(company_name: str, start_date: datetime = None, end_date: datetime = None,
+                              page: int = 0, serp_format: str = None) -> List[str]:
+    """Return all article links on a Bing News results page."""
+    return [result.url for result in await search_results(company_name, start_date, end_date, page, serp_format)]
+
+async def _candidate_urls(company_name: str, start_date: datetime, end_date: datetime, max_candidates: int,
+                          first_page: List[SearchResult], serp_format: str = None) -> AsyncIterator[str]:
+    """
+    Yield up to `max_candidates` unique article links, paging through Bing results.
+    Links are unwrapped and stripped of tracking parameters, and variants of the
+    same story (AMP, mobile, redirect wrappers) are yielded only once.
+    Bing's interval filter isn't strict, so results whose card date is outside
+    the interval are dropped here, before anything is downloaded.
+    The next page is fetched in the background while the current one is consumed,
+    and paging stops as soon as the consumer closes the generator.
+    """
+    seen = set()
+    yielded = skipped = 0
+    next_page = None
+    try:
+        page, results = 0, first_page
+        while True:
+            # Dedup on canonical identity before anything is scheduled for download
+            new_results = []
+            for result in results:
+                key = canonicalize_url(result.url)
+                if key not in seen:
+                    seen.add(key)
+                    new_results.append(result)
+            if not new_results:
+                return
+            in_range = [result for result in new_results if not outside_interval(result, start_date, end_date)]
+            skipped += len(new_results) - len(in_range)
+            
+            if yielded + len(in_range) < max_candidates and page + 1 < MAX_RESULT_PAGES:
+                next_page = asyncio.ensure_future(search_results(company_name, start_date, end_date, page + 1,
+                                                                 serp_format))
+            for result in in_range[:max_candidates - yielded]:
+                yielded += 1
+                yield clean_url(result.url)
+            
+            if next_page is None:
+                return
+            try:
+                page, results = page + 1, await next_page
+            except Exception as e:
+                logger.warning(f"Error fetching results page {page + 1}: {str(e)}")
+                return
+            finally:
+                next_page = None
+    finally:
+        if next_page is not None:
+            next_page.cancel()
+        if skipped:
+            logger.info(f"Skipped {skipped} results for '{company_name}' dated outside the requested interval")
+
+async def _bing_news_articles(company_name: str, num_articles: int, start_date: datetime, end_date: datetime,
+                              max_workers: int, fields: Iterable[str] = None) -> List[Dict]:
+    _set_requested_fields(fields)
     articles = []
     max_retries = 3
     retry_delay = 2
     
     try:
         for attempt in range(max_retries):
-            try:
-                response = requests.get(url, headers=headers, timeout=15)
-                response.raise_for_status()
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Try different selectors for news cards
-                news_cards = soup.find_all('a', {'class': 'title'})
-                if not news_cards:
-                    news_cards = soup.find_all('div', {'class': 'news-card'})
-                if not news_cards:
-                    news_cards = soup.find_all('div', {'class': 'news-item'})
-                
-                if not news_cards:
-                    logger.warning("No news cards found in the response")
-                    if attempt < max_retries - 1:
-                        time.sleep(retry_delay)
-                        continue
-                    return []
-                
-                for link in news_cards[:num_articles]:
-                    try:
-                        article_url = link.get('href')
-                        if not article_url:
-                            continue
-                            
-                        # Add random delay between requests
-                        time.sleep(random.uniform(1, 3))
-                        
-                        article = Article(article_url)
-                        article.download()
-                        article.parse()
-                        article.nlp()
-                        
-                        if article.title and article.text:
-                            sentiment = get_sentiment(article.text)
-                            # Ensure we have a valid date
-                            article_date = article.publish_date if article.publish_date else datetime.now()
-                            articles.append({
-                                'title': article.title,
-                                'summary': article.summary,
-                                'text': article.text,
-                                'url': article_url,
-                                'sentiment': sentiment,
-                                'topics': article.keywords[:5] if article.keywords else [],
-                                'source': 'Bing News',
-                                'date': article_date.strftime('%Y-%m-%d')
-                            })
-                            logger.info(f"Successfully processed article: {article.title}")
-                    except Exception as e:
-                        logger.warning(f"Error processing article {article_url}: {str(e)}")
-                        continue
-                
-                if articles:
-                    break
-                    
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Request error on attempt {attempt + 1}: {str(e)}")
+            # Network errors are already retried by the shared session
+            first_page = await search_results(company_name, start_date, end_date)
+            
+            if not first_page:
+                logger.warning("No news cards found in the response")
                 if attempt < max_retries - 1:
-                    time.sleep(retry_delay * (attempt + 1))  # Exponential backoff
+                    await asyncio.sleep(retry_delay)
                     continue
-                raise
+                return []
+            
+            candidates = _candidate_urls(company_name, start_date, end_date, num_articles, first_page)
+            results = [pair async for pair in _stream_articles(candidates, max_workers)]
+            articles = [article for _, article in sorted(results, key=lambda pair: pair[0])]
+            
+            if articles:
+                break
                 
         return articles
         
@@ -119,10 +398,267 @@ def get_bing_news_articles(company_name: str, num_articles: int, start_date: dat
         logger.error(f"Error fetching from Bing News: {str(e)}")
         return []
 
+async def _iterate(items: List) -> AsyncIterator:
+    for item in items:
+        yield item
+
+async def _stream_articles(article_urls: Union[List[str], AsyncIterator[str]], max_workers: int,
+                           limit: int = None, ranked: bool = False) -> AsyncIterator[Tuple[int, Dict]]:
+    """
+    Process articles with at most `max_workers` in flight, yielding (index, article)
+    pairs as they complete. `article_urls` may be a list or an async iterator that
+    produces candidates lazily. Once `limit` articles have been yielded no new work
+    is scheduled and in-flight downloads are cancelled.
+    With `ranked`, downloads ranked above the `limit`-th success are still awaited,
+    so the `limit` lowest indexes yielded are the top-ranked successes overall.
+    """
+    candidates = article_urls if hasattr(article_urls, '__anext__') else _iterate(article_urls)
+    exhausted = False
+    next_index = 0
+    pending = {}
+    succeeded = []
+    try:
+        while True:
+            if limit and len(succeeded) >= limit:
+                # Only downloads ranked above the current cut-off can still change the result
+                cutoff = heapq.nsmallest(limit, succeeded)[-1]
+                for task in [task for task, index in pending.items() if index > cutoff]:
+                    task.cancel()
+                    del pending[task]
+                exhausted = True
+            while not exhausted and len(pending) < max(1, max_workers):
+                try:
+                    article_url = await candidates.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending[asyncio.ensure_future(process_article_async(article_url))] = next_index
+                next_index += 1
+            if not pending:
+                return
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = pending.pop(task)
+                article = task.result()
+                if article:
+                    succeeded.append(index)
+                    yield index, article
+                    if limit and len(succeeded) >= limit and not ranked:
+                        return
+    finally:
+        for task in pending:
+            task.cancel()
+        await candidates.aclose()
+
+async def process_article_async(article_url: str) -> Optional[Dict]:
+    """Download an article on the event loop and hand the raw HTML to the CPU worker pool.
+
+    Fresh cache hits skip the download and parse entirely; stale entries
+    are revalidated with a conditional GET. URLs that recently failed are
+    skipped, and new failures of the URL itself are recorded. Near-duplicate bodies share one
+    summary/keyword/sentiment analysis. Summary and keywords are only computed
+    here if the query requested them (see requested_fields).
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        # When recording, every article is fetched so the archive holds all of them
+        recording = is_recording()
+        entry = None if recording else await loop.run_in_executor(None, article_cache.get, article_url)
+        if entry and article_cache.is_fresh(entry):
+            return await _cached_article_record(article_url, entry)
+        if not recording and await loop.run_in_executor(None, failed_urls.is_blocked, article_url):
+            logger.info(f"Skipping recently failed article {article_url}")
+            return None
+        
+        headers = article_cache.conditional_headers(entry) if entry else None
+        response = await fetch(article_url, headers=headers)
+        
+        if response.status == 304 and entry:
+            await loop.run_in_executor(None, article_cache.touch, article_url, entry)
+            await loop.run_in_executor(None, failed_urls.clear, article_url)
+            return await _cached_article_record(article_url, entry)
+        
+        extracted = await cpu_pool.run(extract_article, article_url, response.text, ARTICLE_EXTRACTOR)
+        if not extracted:
+            await loop.run_in_executor(None, failed_urls.record, article_url, "no extractable content")
+            return None
+        fields, fingerprint = extracted
+        analysis = await _shared_analysis(article_url, fields, fingerprint, _summaries_requested())
+        fields.update({key: analysis[key] for key in ('sentiment', 'summary', 'keywords') if key in analysis})
+        await loop.run_in_executor(None, article_cache.put, article_url, response.text, fields,
+                                   response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        # It worked this time, so an earlier failure shouldn't count towards a longer back-off
+        await loop.run_in_executor(None, failed_urls.clear, article_url)
+        return build_article_record(article_url, fields, fields['sentiment'])
+    except (CircuitOpenError, DeadlineExceeded) as e:
+        logger.info(f"Skipping article {article_url}: {str(e)}")
+        return None
+    except Exception as e:
+        logger.warning(f"Error processing article {article_url}: {str(e)}")
+        if _is_url_failure(e):
+            await loop.run_in_executor(None, failed_urls.record, article_url, str(e) or type(e).__name__)
+        return None
+
+def _is_url_failure(error: Exception) -> bool:
+    """True if `error` means the URL itself is unusable (gone, not an article, too large)."""
+    if isinstance(error, (UnsupportedContentError, ResponseTooLargeError)):
+        return True
+    return isinstance(error, aiohttp.ClientResponseError) and error.status in PERMANENT_FAILURE_STATUSES
+
+async def _cached_article_record(article_url: str, entry: Dict) -> Dict:
+    """
+    Article record from a cache entry, adding the sentiment (entries written before it
+    was cached) and the summary if they are needed but weren't computed before.
+    """
+    fields = entry['fields']
+    added = {}
+    if 'sentiment' not in fields:
+        added['sentiment'] = await sentiment_batcher.submit(fields['text'])
+    if 'summary' not in fields and _summaries_requested():
+        added.update(await cpu_pool.run(summarize_article, fields['title'], fields['text']))
+    if added:
+        fields = {**fields, **added}
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, article_cache.update_fields, article_url, entry, fields)
+    return build_article_record(article_url, fields, fields['sentiment'])
+
+async def _shared_analysis(article_url: str, fields: Dict, fingerprint: Optional[int], summarize: bool = True) -> Dict:
+    """
+    Run the expensive per-article analysis (sentiment and, if `summarize`, summary and
+    keywords) once per near-duplicate cluster; other members of the cluster reuse the result.
+    Bodies too short to fingerprint are always analyzed on their own.
+    """
+    def analyze_sentiment():
+        return sentiment_batcher.submit(fields['text'])
+    
+    def analyze_summary():
+        return cpu_pool.run(summarize_article, fields['title'], fields['text'])
+    
+    if fingerprint is None:
+        steps = [analyze_sentiment()] + ([analyze_summary()] if summarize else [])
+    else:
+        # Cluster ids include the founding fingerprint, so a page whose body changed gets a fresh analysis
+        cluster_id = near_duplicates.add(canonicalize_url(article_url), fingerprint)
+        if cluster_id[0] != canonicalize_url(article_url):
+            logger.info(f"Sharing analysis of near-duplicate {cluster_id[0]} with {article_url}")
+        steps = [_shared_result((cluster_id, 'sentiment'), analyze_sentiment)]
+        if summarize:
+            steps.append(_shared_result((cluster_id, 'summary'), analyze_summary))
+    results = await asyncio.gather(*steps)
+    return {'sentiment': results[0], **(results[1] if summarize else {})}
+
+async def _shared_result(key: Tuple, compute: Callable[[], Awaitable]):
+    """Await the result stored under `key` in the shared analyses, computing it if nobody has yet."""
+    while True:
+        future = _cluster_analyses.get(key)
+        if future is None:
+            break
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            # The article computing the result was cancelled; compute it here instead
+        except Exception:
+            # The article computing the result failed; compute it here instead
+            pass
+    
+    future = asyncio.get_running_loop().create_future()
+    _cluster_analyses[key] = future
+    while len(_cluster_analyses) > MAX_SHARED_ANALYSES:
+        _cluster_analyses.popitem(last=False)
+    try:
+        result = await compute()
+    except BaseException as e:
+        if _cluster_analyses.get(key) is future:
+            del _cluster_analyses[key]
+        if isinstance(e, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(e)
+            # Waiters handle the failure; don't warn about an unretrieved exception
+            future.exception()
+        raise
+    future.set_result(result)
+    return result
+
+def get_full_article(article_url: str) -> Optional[Dict]:
+    """Download and analyze a single article, e.g. to expand a lite record. Returns None if it can't be processed."""
+    return run_sync(process_article_async(article_url))
+
+class LazyArticle(dict):
+    """
+    An article record whose `summary` and `topics` are computed on first access
+    if the query didn't request them. Until then they are not among the keys,
+    so iterating or exporting the record doesn't pay for them.
+    """
+
+    def __missing__(self, key):
+        if key not in LAZY_FIELDS or 'text' not in self:
+            raise KeyError(key)
+        analysis = summarize_article(self['title'], self['text'])
+        self['summary'] = analysis['summary']
+        self['topics'] = analysis['keywords'][:5]
+        return self[key]
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+def build_article_record(article_url: str, fields: Dict, sentiment: str = None) -> Dict:
+    """Build the article dictionary returned to callers from extracted fields."""
+    sentiment = sentiment or get_sentiment(fields['text'])
+    # Ensure we have a valid date
+    article_date = datetime.fromisoformat(fields['publish_date']) if fields.get('publish_date') else datetime.now()
+    logger.info(f"Successfully processed article: {fields['title']}")
+    record = LazyArticle({
+        'title': fields['title'],
+        'summary': fields.get('summary'),
+        'text': fields['text'],
+        'url': article_url,
+        'sentiment': sentiment,
+        'topics': fields['keywords'][:5] if 'keywords' in fields else None,
+        'source': 'Bing News',
+        'date': article_date.strftime('%Y-%m-%d')
+    })
+    # Fields that weren't computed are left out so LazyArticle computes them on first access
+    for key in LAZY_FIELDS:
+        if record[key] is None:
+            del record[key]
+    return record
+
+def build_lite_record(result: SearchResult, sentiment: str) -> Dict:
+    """
+    Build an article dictionary from a search result alone: the snippet stands in
+    for the summary and text, and the date comes from the card. `lite` marks
+    records whose article hasn't been downloaded.
+    """
+    published = result.published_at()
+    return {
+        'title': result.title,
+        'summary': result.snippet,
+        'text': result.snippet,
+        'url': clean_url(result.url),
+        'sentiment': sentiment,
+        'topics': [],
+        'source': result.source or 'Bing News',
+        'date': (published or datetime.now()).strftime('%Y-%m-%d'),
+        'lite': True
+    }
+
 def get_sentiment(text: str) -> str:
     # Placeholder for sentiment analysis
     return 'Neutral'
 
+def get_sentiments(texts: List[str]) -> List[str]:
+    """Sentiment for a batch of texts; the entry point for batched model inference."""
+    return [get_sentiment(text) for text in texts]
+
+# Concurrent articles (across all queries) are scored together in small batches
+sentiment_batcher = MicroBatcher(get_sentiments)
+
 def analyze_sentiment_distribution(articles: List[Dict]) -> Dict:
     sentiment_counts = {
         'Positive': 0,
@@ -0,0 +1,329 @@
+"""Incremental watch mode for monitoring companies.
+
+Each company has a persisted high-water mark: the latest article date seen
+and the set of (canonical) article URLs already processed. A poll only asks
+Bing for the interval since that date, pages through results only until they
+reach links processed before, and downloads and scores only the unseen
+articles, so the steady-state cost of a poll follows the number of new
+articles rather than the size of the result set.
+
+Paging stops at the first results page that contains an already processed
+link, so a first poll (capped at INITIAL_ARTICLES) doesn't leave a backlog
+of older results to be worked through later.
+
+Large watchlists are driven by WatchlistScheduler, which polls each company
+as often as its recent article velocity warrants.
+
+Usage:
+    python watch.py Apple Tesla --min-interval 60 --max-interval 3600
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from cache import CACHE_DIR, _read_json, _write_json_atomic
+from fetcher import PRIORITY_BACKGROUND, iterate_async, iterate_sync, run_on_engine, run_sync, set_priority
+from urls import canonicalize_url, clean_url
+from utils import (MAX_CONCURRENT_DOWNLOADS, MAX_RESULT_PAGES, _iterate, _stream_articles, failed_urls,
+                   search_article_urls)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Poll scheduling; intervals are in seconds
+WATCH_INTERVAL = 5 * 60  # until a company's article velocity is known
+MIN_POLL_INTERVAL = 60
+MAX_POLL_INTERVAL = 60 * 60
+TARGET_NEW_PER_POLL = 3  # intervals aim at about this many new links per poll
+VELOCITY_SMOOTHING = 0.5  # weight of the latest poll in the velocity average
+MAX_CONCURRENT_POLLS = 4
+INITIAL_ARTICLES = 10  # articles processed on the first poll of a company
+MAX_NEW_PER_POLL = 50
+MAX_SEEN_URLS = 5000  # per company; the oldest are forgotten first
+WATERMARK_OVERLAP = timedelta(days=1)  # Bing date filters are day-granular
+
+
+@dataclass
+class Watermark:
+    """What has already been processed for one company."""
+    company: str
+    latest_date: Optional[str] = None  # YYYY-MM-DD of the newest article seen
+    seen: Dict[str, float] = field(default_factory=OrderedDict)  # canonical URL -> first seen timestamp
+    last_poll: Optional[float] = None
+    velocity: Optional[float] = None  # smoothed new links per hour; None until a second poll
+
+    def record_velocity(self, new_links: int, elapsed: float):
+        rate = new_links / max(elapsed, 1.0) * 3600
+        self.velocity = rate if self.velocity is None else (
+            VELOCITY_SMOOTHING * rate + (1 - VELOCITY_SMOOTHING) * self.velocity)
+
+    def is_seen(self, url: str) -> bool:
+        return canonicalize_url(url) in self.seen
+
+    def mark_seen(self, url: str):
+        self.seen.setdefault(canonicalize_url(url), time.time())
+        while len(self.seen) > MAX_SEEN_URLS:
+            self.seen.pop(next(iter(self.seen)))
+
+    def advance(self, article_date: str):
+        if article_date and (self.latest_date is None or article_date > self.latest_date):
+            self.latest_date = article_date
+
+    def search_interval(self) -> Tuple[Optional[datetime], Optional[datetime]]:
+        """Date interval for the search query: from just before the watermark to today."""
+        if not self.latest_date:
+            return None, None
+        end = datetime.now()
+        start = min(datetime.fromisoformat(self.latest_date), end) - WATERMARK_OVERLAP
+        return start, end
+
+
+class WatchStore:
+    """Watermarks persisted as one JSON file per company."""
+
+    def __init__(self, directory: str = os.path.join(CACHE_DIR, 'watch')):
+        self.directory = directory
+        self._lock = threading.Lock()
+
+    def _path(self, company: str) -> str:
+        normalized = ' '.join(company.lower().split())
+        return os.path.join(self.directory, hashlib.sha256(normalized.encode('utf-8')).hexdigest()[:32] + '.json')
+
+    def load(self, company: str) -> Watermark:
+        try:
+            data = _read_json(self._path(company))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable watermark for '{company}': {str(e)}")
+            data = None
+        if not data:
+            return Watermark(company)
+        return Watermark(company, data.get('latest_date'), OrderedDict(data.get('seen', {})), data.get('last_poll'),
+                         data.get('velocity'))
+
+    def save(self, watermark: Watermark):
+        data = {
+            'company': watermark.company,
+            'latest_date': watermark.latest_date,
+            'seen': watermark.seen,
+            'last_poll': watermark.last_poll,
+            'velocity': watermark.velocity,
+        }
+        with self._lock:
+            try:
+                _write_json_atomic(self._path(watermark.company), data)
+            except OSError as e:
+                logger.warning(f"Could not save watermark for '{watermark.company}': {str(e)}")
+
+
+@dataclass
+class WatchEvent:
+    """A newly seen article for a watched company."""
+    company: str
+    article: Dict
+    detected_at: datetime
+
+
+watch_store = WatchStore()
+_poll_locks = {}
+
+
+def poll(company_name: str, max_new: int = MAX_NEW_PER_POLL) -> List[Dict]:
+    """Process the articles for `company_name` that previous polls haven't seen, newest first."""
+    return run_sync(_poll(company_name, max_new))
+
+
+async def poll_async(company_name: str, max_new: int = MAX_NEW_PER_POLL) -> List[Dict]:
+    """Async version of poll; can be awaited from any event loop."""
+    return await run_on_engine(_poll(company_name, max_new))
+
+
+def watch(companies: List[str], min_interval: float = MIN_POLL_INTERVAL, max_interval: float = MAX_POLL_INTERVAL,
+          max_new: int = MAX_NEW_PER_POLL) -> Iterator[WatchEvent]:
+    """
+    Poll `companies` forever, yielding an event per new article.
+    Each company is polled every `min_interval` to `max_interval` seconds
+    depending on how many new articles it has been getting (see WatchlistScheduler).
+    """
+    return iterate_sync(WatchlistScheduler(companies, min_interval, max_interval, max_new=max_new).run())
+
+
+def watch_async(companies: List[str], min_interval: float = MIN_POLL_INTERVAL, max_interval: float = MAX_POLL_INTERVAL,
+                max_new: int = MAX_NEW_PER_POLL) -> AsyncIterator[WatchEvent]:
+    """Async version of watch, for use with `async for` on any event loop."""
+    return iterate_async(WatchlistScheduler(companies, min_interval, max_interval, max_new=max_new).run())
+
+
+async def _serp_delta(watermark: Watermark, max_new: int) -> List[str]:
+    """Unseen article links for the company, paging only until results overlap earlier polls."""
+    start_date, end_date = watermark.search_interval()
+    new_urls, keys = [], set()
+    for page in range(MAX_RESULT_PAGES):
+        try:
+            article_urls = await search_article_urls(watermark.company, start_date, end_date, page)
+        except Exception as e:
+            logger.warning(f"Error fetching results page {page} for '{watermark.company}': {str(e)}")
+            break
+        unseen, overlaps = [], False
+        for article_url in article_urls:
+            key = canonicalize_url(article_url)
+            if key in watermark.seen:
+                overlaps = True
+            elif key not in keys:
+                keys.add(key)
+                unseen.append(clean_url(article_url))
+        new_urls.extend(unseen)
+        # Once a page reaches links processed before, earlier polls already covered the rest
+        if overlaps or not unseen or len(new_urls) >= max_new:
+            break
+    return new_urls[:max_new]
+
+
+async def _poll(company_name: str, max_new: int) -> List[Dict]:
+    articles, _ = await _poll_watermark(company_name, max_new)
+    return articles
+
+
+async def _poll_watermark(company_name: str, max_new: int) -> Tuple[List[Dict], Watermark]:
+    lock = _poll_locks.setdefault(company_name.lower(), asyncio.Lock())
+    async with lock:
+        loop = asyncio.get_running_loop()
+        watermark = await loop.run_in_executor(None, watch_store.load, company_name)
+        first_poll = watermark.last_poll is None
+        new_urls = await _serp_delta(watermark, INITIAL_ARTICLES if first_poll else max_new)
+
+        articles = []
+        produced = set()
+        async for index, article in _stream_articles(_iterate(new_urls), MAX_CONCURRENT_DOWNLOADS):
+            articles.append(article)
+            produced.add(index)
+            watermark.advance(article.get('date'))
+        # A failed link is only marked seen once the negative cache has given up on it;
+        # temporary failures (timeouts, open circuits, 5xx) are retried on the next poll
+        for index, article_url in enumerate(new_urls):
+            if index in produced or await loop.run_in_executor(None, failed_urls.is_blocked, article_url):
+                watermark.mark_seen(article_url)
+        now = time.time()
+        if not first_poll:
+            watermark.record_velocity(len(new_urls), now - watermark.last_poll)
+        watermark.last_poll = now
+        await loop.run_in_executor(None, watch_store.save, watermark)
+
+        logger.info(f"Watch poll for '{company_name}': {len(new_urls)} unseen links, {len(articles)} new articles")
+        return sorted(articles, key=lambda article: article.get('date', ''), reverse=True), watermark
+
+
+class WatchlistScheduler:
+    """Polls a watchlist, each company as often as its recent article velocity warrants.
+
+    A company's poll interval aims at TARGET_NEW_PER_POLL new links per poll,
+    clamped to [min_interval, max_interval], so hot companies (earnings day)
+    are polled often and quiet ones rarely. Due companies are polled earliest
+    deadline first with at most `max_concurrent_polls` at a time and at most
+    `max_new` articles each, so a hot company can't starve the rest. Polls run
+    at background priority with the company as fairness flow (see
+    fetcher.set_priority), so interactive queries in the same process go first.
+    """
+
+    def __init__(self, companies: List[str] = (), min_interval: float = MIN_POLL_INTERVAL,
+                 max_interval: float = MAX_POLL_INTERVAL, max_concurrent_polls: int = MAX_CONCURRENT_POLLS,
+                 max_new: int = MAX_NEW_PER_POLL):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.max_concurrent_polls = max(1, max_concurrent_polls)
+        self.max_new = max_new
+        self.intervals = {}  # company -> current poll interval in seconds
+        self._due = {}  # company -> monotonic time of its next poll
+        for company in companies:
+            self.add(company)
+
+    def add(self, company: str):
+        """Start watching `company`; its first poll is due immediately."""
+        self._due.setdefault(company, time.monotonic())
+
+    def remove(self, company: str):
+        self._due.pop(company, None)
+        self.intervals.pop(company, None)
+
+    def interval_for(self, velocity: Optional[float]) -> float:
+        """Poll interval for a company producing `velocity` new links per hour."""
+        if velocity is None:
+            interval = WATCH_INTERVAL
+        elif velocity <= 0:
+            interval = self.max_interval
+        else:
+            interval = TARGET_NEW_PER_POLL / velocity * 3600
+        return min(self.max_interval, max(self.min_interval, interval))
+
+    async def _background_poll(self, company: str) -> Tuple[List[Dict], Watermark]:
+        # Only affects this task and the fetches it spawns
+        set_priority(PRIORITY_BACKGROUND, company)
+        return await _poll_watermark(company, self.max_new)
+
+    async def run(self) -> AsyncIterator[WatchEvent]:
+        """Poll forever, yielding an event per new article as each poll completes."""
+        running = {}  # task -> company
+        try:
+            while True:
+                now = time.monotonic()
+                busy = set(running.values())
+                due = sorted((due_at, company) for company, due_at in self._due.items()
+                             if due_at <= now and company not in busy)
+                for _, company in due[:self.max_concurrent_polls - len(running)]:
+                    running[asyncio.ensure_future(self._background_poll(company))] = company
+
+                timeout = None
+                if len(running) < self.max_concurrent_polls:
+                    busy = set(running.values())
+                    next_due = min((due_at for company, due_at in self._due.items() if company not in busy), default=None)
+                    timeout = self.min_interval if next_due is None else max(0.0, next_due - now)
+                if not running:
+                    await asyncio.sleep(timeout)
+                    continue
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    company = running.pop(task)
+                    interval = self.intervals.get(company, WATCH_INTERVAL)
+                    try:
+                        articles, watermark = task.result()
+                    except Exception as e:
+                        logger.error(f"Watch poll for '{company}' failed: {str(e)}")
+                        articles = []
+                    else:
+                        interval = self.interval_for(watermark.velocity)
+                    if company in self._due:
+                        self.intervals[company] = interval
+                        self._due[company] = time.monotonic() + interval
+                        logger.info(f"Next poll for '{company}' in {interval:.0f}s")
+                    detected_at = datetime.now()
+                    for article in articles:
+                        yield WatchEvent(company, article, detected_at)
+        finally:
+            for task in running:
+                task.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Emit new articles for watched companies as JSON lines.")
+    parser.add_argument('companies', nargs='+')
+    parser.add_argument('--min-interval', type=float, default=MIN_POLL_INTERVAL, help="seconds between polls of a hot company")
+    parser.add_argument('--max-interval', type=float, default=MAX_POLL_INTERVAL, help="seconds between polls of a quiet company")
+    parser.add_argument('--max-new', type=int, default=MAX_NEW_PER_POLL)
+    args = parser.parse_args()
+    for event in watch(args.companies, args.min_interval, args.max_interval, args.max_new):
+        record = {key: value for key, value in event.article.items() if key != 'text'}
+        print(json.dumps({'company': event.company, 'detected_at': event.detected_at.isoformat(), **record}), flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+"""CPU stage of the article pipeline, run in a pool of worker processes.
+
+Extraction, fingerprinting and summarization are pure-Python CPU work that
+the GIL would serialize in threads. The fetch engine downloads articles
+(I/O stage) and hands the raw HTML to a long-lived process pool (CPU stage)
+so the work scales across cores. Workers are started with the 'spawn'
+method and warmed up by an initializer (imports, stopword lists, tokenizer
+data and a throwaway extraction), so tasks don't pay startup costs.
+
+NEWS_CPU_WORKERS sets the pool size (default: one per core); 0 runs the CPU
+stage in the engine's thread executor instead.
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, Optional, Tuple
+
+import newspaper
+from newspaper import nlp as newspaper_nlp
+
+from dedup import simhash
+from extractors import get_extractor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CPU_WORKERS = int(os.environ.get('NEWS_CPU_WORKERS', os.cpu_count() or 1))
+
+_WARM_UP_HTML = (
+    "<html><head><title>Warm up</title><meta property='article:published_time' content='2024-01-01T00:00:00Z'>"
+    "</head><body><article><h1>Warm up</h1>"
+    + "<p>The company reported quarterly results as revenue grew and analysts raised their estimates.</p>" * 5
+    + "</article></body></html>"
+)
+
+# Extractor instances of this process, by backend name
+_extractors = {}
+
+
+def summarize_article(title: str, text: str) -> Dict:
+    """Summary and keywords for an article body; the same computation as newspaper's Article.nlp()."""
+    config = newspaper.Config()
+    newspaper_nlp.load_stopwords(config.get_language())
+    keywords = list(set(newspaper_nlp.keywords(title)) | set(newspaper_nlp.keywords(text)))
+    summary_sentences = newspaper_nlp.summarize(title=title, text=text, max_sents=config.MAX_SUMMARY_SENT)
+    return {
+        'summary': '\n'.join(summary_sentences)[:config.MAX_SUMMARY],
+        'keywords': keywords[:config.MAX_KEYWORDS],
+    }
+
+
+def extract_article(article_url: str, html: str, extractor_name: str) -> Optional[Tuple[Dict, Optional[int]]]:
+    """Extract article fields from raw HTML and fingerprint the body; None if there is no usable content."""
+    if extractor_name not in _extractors:
+        _extractors[extractor_name] = get_extractor(extractor_name)
+    fields = _extractors[extractor_name].extract(article_url, html)
+    if not fields:
+        return None
+    return fields, simhash(fields['text'])
+
+
+def _warm_up(extractor_name: str):
+    """Pool initializer: pay import and data loading costs before the first real task."""
+    try:
+        extracted = extract_article('https://example.com/warm-up', _WARM_UP_HTML, extractor_name)
+        if extracted:
+            summarize_article(extracted[0]['title'], extracted[0]['text'])
+    except Exception as e:
+        # Missing tokenizer data etc. surfaces again (and is handled) on real tasks
+        logger.warning(f"CPU worker warm-up incomplete: {str(e)}")
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+class CpuPool:
+    """A lazily started, long-lived process pool for the CPU stage.
+
+    If a worker dies the pool is replaced, and the task that hit the broken
+    pool fails like any other extraction error.
+    """
+
+    def __init__(self, max_workers: int = CPU_WORKERS, extractor_name: str = 'newspaper'):
+        self.max_workers = max_workers
+        self.extractor_name = extractor_name
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.max_workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_warm_up,
+                    initargs=(self.extractor_name,),
+                )
+                # Start every worker now rather than on demand, so all of them warm up in parallel
+                for _ in range(self.max_workers):
+                    self._executor.submit(_ready)
+                logger.info(f"Started {self.max_workers} CPU worker processes")
+            return self._executor
+
+    def start(self):
+        """Start and warm up the worker processes ahead of the first query."""
+        self._get_executor()
+
+    async def run(self, fn: Callable, *args):
+        """Run `fn(*args)` in a worker process (or the default executor if the pool is disabled)."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            logger.warning("CPU worker pool broke; starting a new one")
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+